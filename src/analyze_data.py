@@ -5,65 +5,47 @@ Author: Kevin Kang
 """
 
 import pandas as pd
-from pulp import LpMaximize, LpProblem, LpVariable, lpSum
 
-# Load the combined data
-merged_df = pd.read_csv('../data/processed/merged_player_goalie_cps_and_salaries.csv')
+import instrument
+import paths
+from optimizer import build_model, roster_sizes, salary_cap, solve_model
+from player_pool import PlayerPool
 
-# Clean the 'cap_hit' column: remove non-numeric characters and convert to float
-merged_df['cap_hit'] = merged_df['cap_hit'].replace({'\$': '', ',': ''}, regex=True)
-merged_df['cap_hit'] = pd.to_numeric(merged_df['cap_hit'], errors='coerce')
 
-# Ensure no NaN values in 'cap_hit' and 'cps'
-merged_df['cap_hit'].fillna(0, inplace=True)
-merged_df['cps'].fillna(0, inplace=True)
+# The optimal roster from the merged CPS + salary data: Player, Position, CPS, Cap Hit
+def analyze(merged_df: pd.DataFrame, cap=salary_cap, sizes=roster_sizes) -> pd.DataFrame:
+    # The compact pool holds CPS, cap hit (formatted values like "$1,000,000" parsed) and positions as typed
+    # arrays, with missing values as 0; names stay in its side table until the roster is rendered
+    with instrument.timer('pool'):
+        pool = PlayerPool.from_frame(merged_df)
 
-# Define constants
-salary_cap = 83.5e6  # Salary cap in dollars
-forwards_needed = 12
-defensemen_needed = 6
-goalies_needed = 2
+    # Roster constants (salary cap, 12 forwards, 6 defensemen, 2 goalies) are defined in optimizer.py.
+    # Maximize total CPS subject to the salary cap and positional limits; the model is built from the pool's arrays
+    with instrument.timer('build_model'):
+        problem, player_vars = build_model(*pool.arrays(), cap=cap, sizes=sizes)
+    with instrument.timer('solve'):
+        selected = solve_model(problem, player_vars)
+    instrument.record('players', len(pool))
 
-# Create a maximization problem
-problem = LpProblem("NHL_Salary_Cap_Optimization", LpMaximize)
+    return pool.render(selected)
 
-# Create binary decision variables for each player
-player_vars = LpVariable.dicts("Player", merged_df.index, cat="Binary")
 
-# Objective: Maximize total CPS
-problem += lpSum(player_vars[i] * merged_df.loc[i, 'cps'] for i in merged_df.index), "Maximize_CPS"
+def main():
+    # Load the combined data
+    merged_df = pd.read_csv(paths.merged_path, float_precision='round_trip')
 
-# Salary cap constraint
-problem += lpSum(player_vars[i] * merged_df.loc[i, 'cap_hit'] for i in merged_df.index) <= salary_cap, "Salary_Cap"
+    selected_df = analyze(merged_df)
 
-# Positional constraints
-problem += lpSum(player_vars[i] for i in merged_df.index if merged_df.loc[i, 'Position'] in ['C', 'L', 'R']) == forwards_needed, "Forwards_Limit"
-problem += lpSum(player_vars[i] for i in merged_df.index if merged_df.loc[i, 'Position'] == 'D') == defensemen_needed, "Defensemen_Limit"
-problem += lpSum(player_vars[i] for i in merged_df.index if merged_df.loc[i, 'Position'] == 'G') == goalies_needed, "Goalies_Limit"
+    # Debug: check total cap hit of selected players
+    total_cap_hit = selected_df['Cap Hit'].sum()
+    print(f"Total Cap Hit of Selected Players: {total_cap_hit}")
 
-# Solve the problem
-problem.solve()
+    # Display the selected players
+    print(selected_df)
 
-# Extract selected players
-selected_players = []
-for i in merged_df.index:
-    if player_vars[i].varValue == 1:
-        selected_players.append({
-            'Player': merged_df.loc[i, 'player'],
-            'Position': merged_df.loc[i, 'Position'],
-            'CPS': merged_df.loc[i, 'cps'],
-            'Cap Hit': merged_df.loc[i, 'cap_hit']
-        })
+    # Save the selected team to a CSV file
+    selected_df.to_csv(paths.roster_path, index=False)
 
-# Convert selected players to a DataFrame
-selected_df = pd.DataFrame(selected_players)
 
-# Debug: check total cap hit of selected players
-total_cap_hit = selected_df['Cap Hit'].sum()
-print(f"Total Cap Hit of Selected Players: {total_cap_hit}")
-
-# Display the selected players
-print(selected_df)
-
-# Save the selected team to a CSV file
-selected_df.to_csv('../result/optimized_team.csv', index=False)
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Check the exact roster solver against the PuLP model and time both
+
+Solves the real merged pool and synthetic pools at a range of caps with both solvers, asserts the
+objective values agree and reports milliseconds per solve.
+
+Usage: python bench_exact.py [pool sizes...]
+
+Author: Kevin Kang
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import optimizer
+import paths
+from bench_optimizer import synthetic_pool
+from exact_roster import solve_roster_exact
+
+pool_sizes = [int(arg) for arg in sys.argv[1:]] or [700, 10_000, 100_000]
+pulp_limit = 10_000  # CBC gets slow beyond this; the exact solver is still timed
+caps = np.linspace(30e6, 110e6, 17)
+
+
+def main():
+    merged_df = pd.read_csv(paths.merged_path)
+    pools = [('merged data', merged_df['cps'].fillna(0).to_numpy(), merged_df['cap_hit'].to_numpy(dtype=float),
+              optimizer.group_masks(merged_df['Position'].to_numpy()))]
+    for n in pool_sizes:
+        pool = synthetic_pool(n)
+        pools.append((f"synthetic {n}", pool['cps'].to_numpy(), pool['cap_hit'].to_numpy(),
+                      optimizer.group_masks(pool['Position'].to_numpy())))
+
+    print(f"{'pool':<18}{'exact ms':>10}{'pulp ms':>10}{'max |diff|':>12}")
+    for name, value, cost, masks in pools:
+        exact_time, pulp_time, worst = 0.0, 0.0, 0.0
+        for cap in caps:
+            start = time.perf_counter()
+            exact = solve_roster_exact(value, cost, masks, cap)
+            exact_time += time.perf_counter() - start
+            assert cost[exact].sum() <= cap
+
+            if len(value) <= pulp_limit:
+                start = time.perf_counter()
+                pulp = optimizer.solve_roster(value, cost, masks, cap)
+                pulp_time += time.perf_counter() - start
+                worst = max(worst, abs(value[exact].sum() - value[pulp].sum()))
+                assert worst < 1e-7, (name, cap)
+
+        pulp_ms = f"{pulp_time / len(caps) * 1000:.1f}" if pulp_time else '-'
+        print(f"{name:<18}{exact_time / len(caps) * 1000:>10.2f}{pulp_ms:>10}{worst:>12.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark the multi-season model's build and solve time as the number of seasons grows
+
+Runs N = 1..5 seasons on the real merged pool and on synthetic pools (bench_optimizer's pools, with
+contract lengths and ages shaped like the real data).
+
+Usage: python bench_multiseason.py [max seasons] [pool sizes...]
+
+Author: Kevin Kang
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from pulp import PULP_CBC_CMD
+
+import multiseason
+import optimizer
+import paths
+from bench_optimizer import synthetic_pool, timed
+
+max_seasons = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+pool_sizes = [int(arg) for arg in sys.argv[2:]] or [2_000, 10_000]
+
+
+def synthetic_contract_pool(n, seed=0):
+    rng = np.random.default_rng(seed)
+    pool = synthetic_pool(n, seed)
+    pool['contract_years_left'] = rng.choice(np.arange(1, 9), size=n, p=[0.35, 0.22, 0.14, 0.1, 0.07, 0.05, 0.04, 0.03])
+    pool['age'] = [f"{age}-0d" for age in rng.integers(19, 39, size=n)]
+    return pool
+
+
+def run(label, pool):
+    value, cost, masks = optimizer.pool_arrays(pool)
+    ages = multiseason.parse_age(pool['age']).to_numpy()
+    for n_seasons in range(1, max_seasons + 1):
+        active = multiseason.active_matrix(pool['contract_years_left'].to_numpy(), n_seasons)
+        values = multiseason.projected_values(value, ages, n_seasons)
+        caps = multiseason.season_caps(n_seasons)
+        (problem, player_vars, _), build = timed(
+            lambda: multiseason.build_multiseason_model(values, cost, masks, active, caps))
+        start = time.perf_counter()
+        optimizer.solve_model(problem, player_vars, PULP_CBC_CMD(msg=False))
+        solve = time.perf_counter() - start
+        print(f"{label:>8}  {len(pool):>8}  {n_seasons:>7}{build:>9.3f}{solve:>9.3f}{problem.objective.value():>11.4f}")
+
+
+def main():
+    print(f"{'pool':>8}  {'players':>8}  {'seasons':>7}{'build s':>9}{'solve s':>9}{'objective':>11}")
+    run('real', pd.read_csv(paths.merged_path))
+    for n in pool_sizes:
+        run('synth', synthetic_contract_pool(n))
+
+
+if __name__ == '__main__':
+    main()
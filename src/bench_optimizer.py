@@ -0,0 +1,72 @@
+"""
+Benchmark roster model construction and solve time on pools of 700, 10k and 100k players
+
+Compares the original per-player .loc model build against the bulk build in optimizer.py. Pools are
+synthetic, with position shares and cap hits shaped like the real merged dataset.
+
+Usage: python bench_optimizer.py [pool sizes...]
+
+Author: Kevin Kang
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from pulp import PULP_CBC_CMD, LpMaximize, LpProblem, LpVariable, lpSum
+
+import optimizer
+
+pool_sizes = [int(arg) for arg in sys.argv[1:]] or [700, 10_000, 100_000]
+loc_build_limit = 10_000  # The original build is too slow to be worth timing beyond this
+
+
+def synthetic_pool(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'player': [f"Player {i}" for i in range(n)],
+        'Position': rng.choice(['C', 'L', 'R', 'D', 'G'], size=n, p=[0.29, 0.16, 0.14, 0.32, 0.09]),
+        'cps': rng.beta(4, 5, size=n),
+        'cap_hit': np.clip(rng.lognormal(14.6, 0.9, size=n), 775_000, 16_000_000).round(-3),
+    })
+
+
+# The model exactly as analyze_data.py used to build it
+def build_with_loc(merged_df):
+    problem = LpProblem("NHL_Salary_Cap_Optimization", LpMaximize)
+    player_vars = LpVariable.dicts("Player", merged_df.index, cat="Binary")
+    problem += lpSum(player_vars[i] * merged_df.loc[i, 'cps'] for i in merged_df.index), "Maximize_CPS"
+    problem += lpSum(player_vars[i] * merged_df.loc[i, 'cap_hit'] for i in merged_df.index) <= optimizer.salary_cap, "Salary_Cap"
+    problem += lpSum(player_vars[i] for i in merged_df.index if merged_df.loc[i, 'Position'] in ['C', 'L', 'R']) == 12, "Forwards_Limit"
+    problem += lpSum(player_vars[i] for i in merged_df.index if merged_df.loc[i, 'Position'] == 'D') == 6, "Defensemen_Limit"
+    problem += lpSum(player_vars[i] for i in merged_df.index if merged_df.loc[i, 'Position'] == 'G') == 2, "Goalies_Limit"
+    return problem, player_vars
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'players':>8}  {'method':<12}{'build s':>9}{'solve s':>9}{'total CPS':>11}")
+    for n in pool_sizes:
+        pool = synthetic_pool(n)
+        value, cost = pool['cps'].to_numpy(), pool['cap_hit'].to_numpy()
+        masks = optimizer.group_masks(pool['Position'].to_numpy())
+
+        if n <= loc_build_limit:
+            (problem, player_vars), build = timed(lambda: build_with_loc(pool))
+            _, solve = timed(lambda: problem.solve(PULP_CBC_CMD(msg=False)))
+            total = sum(pool.loc[i, 'cps'] for i in pool.index if player_vars[i].varValue == 1)
+            print(f"{n:>8}  {'pulp .loc':<12}{build:>9.3f}{solve:>9.3f}{total:>11.4f}")
+
+        (problem, player_vars), build = timed(lambda: optimizer.build_model(value, cost, masks))
+        selected, solve = timed(lambda: optimizer.solve_model(problem, player_vars))
+        print(f"{n:>8}  {'pulp bulk':<12}{build:>9.3f}{solve:>9.3f}{value[selected].sum():>11.4f}")
+
+
+if __name__ == '__main__':
+    main()
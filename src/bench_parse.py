@@ -0,0 +1,82 @@
+"""
+Micro-benchmark of Spotrac page parsing per backend
+
+Renders team and profile pages from a saved contract CSV, checks every backend extracts the same
+values, and reports parse time per page for each backend against the original one-search-per-label
+BeautifulSoup approach.
+
+Usage: python bench_parse.py [contract_csv] [padding_items]
+
+Author: Kevin Kang
+"""
+
+import sys
+import time
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+import spotrac_parse
+import paths
+from get_data import teams
+from spotrac_fixtures import make_padding, render_player_page, render_team_page
+
+contract_csv = sys.argv[1] if len(sys.argv) > 1 else paths.contract_path('2024-09-19')
+padding_items = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+profile_sample = 100
+
+
+# The original profile parse: a full-tree search for each label
+def original_profile_fields(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    fields = {}
+    for label, tag in spotrac_parse.profile_labels.items():
+        node = soup.find(string=label)
+        if node is not None:
+            fields[label] = node.find_next(tag).text
+    return fields
+
+
+def original_team_rows(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    return soup.find('table', {'class': 'table-internal-sort'}).find_all('tr')
+
+
+def time_per_page(parse, pages, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            parse(page)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages) * 1000
+
+
+def main():
+    df = pd.read_csv(contract_csv)
+    padding = make_padding(padding_items)
+    team_pages = [render_team_page(df[df['team_name'] == name], 'http://localhost', padding).encode()
+                  for name in teams.values()]
+    profile_pages = [render_player_page(row, padding).encode() for _, row in df.head(profile_sample).iterrows()]
+
+    backends = spotrac_parse.available_backends()
+    for backend in backends:
+        for page in profile_pages:
+            assert spotrac_parse.profile_fields(page, backend) == original_profile_fields(page), backend
+        for page in team_pages:
+            rows = spotrac_parse.team_rows(page, backend)
+            assert len(rows) == len(original_team_rows(page)), backend
+            assert rows == spotrac_parse.team_rows(page, 'html.parser'), backend
+
+    print(f"Profile page {len(profile_pages[0]) / 1024:.0f} KB, team page {len(team_pages[0]) / 1024:.0f} KB")
+    print(f"{'backend':<28}{'profile ms/page':>16}{'team ms/page':>14}")
+    results = [('html.parser (per-label)', original_profile_fields, original_team_rows)]
+    results += [(backend, lambda page, b=backend: spotrac_parse.profile_fields(page, b),
+                 lambda page, b=backend: spotrac_parse.team_rows(page, b)) for backend in backends]
+    for name, profile_parse, team_parse in results:
+        print(f"{name:<28}{time_per_page(profile_parse, profile_pages):>16.2f}"
+              f"{time_per_page(team_parse, team_pages):>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+End-to-end benchmark: load, clean, integrate, merge and analyze on synthetic data at several scales
+
+Each scale's inputs come from synthetic_data.py (generated on first use). The stages run as the
+pipeline runs them, measured by instrument.RunReport (wall time, CPU time, peak memory, rows out), and
+each stage keeps its fastest wall time over the repeats. Every run is appended to
+result/benchmarks/history.jsonl. It is compared with the stored baseline (result/benchmarks/baseline.json):
+a stage is a regression when it is `tolerance` times slower than the baseline and at least
+`min_seconds` slower.
+
+The scales are also compared with each other, since a baseline taken with a super-linear stage would
+hide it: between two scales, a stage whose wall time grows like scale ** `max_exponent` or faster
+(and takes at least `min_scaling_seconds` at the larger scale) is flagged as super-linear. Such a
+run is not saved as the baseline, and --check fails on it.
+
+Usage: python bench_pipeline.py [scales...] [--repeats N] [--save-baseline] [--check] [--tolerance 1.25]
+       --save-baseline stores this run as the baseline; --check exits with status 1 on a regression
+
+Author: Kevin Kang
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import math
+import subprocess
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+import analyze_data
+import clean_data
+import integrate_data
+import merge_data
+import paths
+import synthetic_data
+from instrument import RunReport
+
+scales = [1, 10, 100]
+repeats = 3
+tolerance = 1.25
+min_seconds = 0.05
+max_exponent = 1.3
+min_scaling_seconds = 0.25
+stage_names = ['load', 'clean', 'integrate', 'merge', 'analyze']
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=paths.root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# One pass over the stages on the synthetic files; the stages' progress output is discarded
+def run_stages(files, report):
+    with contextlib.redirect_stdout(io.StringIO()):
+        with report.stage('load') as entry:
+            raw = {table: pd.read_csv(path) for table, path in files.items()}
+            entry['rows_out'] = {table: len(df) for table, df in raw.items()}
+        with report.stage('clean') as entry:
+            skater_stats, goalie_stats = clean_data.clean(raw['player_stats'], raw['plus_minus'],
+                                                          raw['goalie_stats'], raw['goalie_wins'])
+            entry['rows_out'] = {'skater_stats': len(skater_stats), 'goalie_stats': len(goalie_stats)}
+        with report.stage('integrate') as entry:
+            _, _, combined_cps, _ = integrate_data.integrate(skater_stats, goalie_stats)
+            entry['rows_out'] = {'combined_cps': len(combined_cps)}
+        with report.stage('merge') as entry:
+            merged = merge_data.merge(combined_cps, raw['contracts'])
+            entry['rows_out'] = {'merged': len(merged)}
+        with report.stage('analyze') as entry:
+            roster = analyze_data.analyze(merged)
+            entry['rows_out'] = {'roster': len(roster)}
+
+
+# {stage: measurements} for one scale, keeping each stage's fastest repeat
+def bench_scale(scale, n_repeats):
+    files = synthetic_data.ensure(scale)
+    best = {}
+    for _ in range(n_repeats):
+        report = RunReport()
+        run_stages(files, report)
+        for entry in report.stages:
+            result = {key: entry[key] for key in ('wall_s', 'cpu_s', 'peak_rss_mb', 'rows_out', 'timers')}
+            if entry['name'] not in best or result['wall_s'] < best[entry['name']]['wall_s']:
+                best[entry['name']] = result
+    return best
+
+
+def load_baseline(path=paths.benchmark_baseline_path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Rows of (scale, stage, wall, baseline wall, ratio, regression) for every stage in both runs
+def compare(run, baseline, tolerance=tolerance, min_seconds=min_seconds):
+    rows = []
+    for scale, stages in run['scales'].items():
+        for stage, result in stages.items():
+            base = ((baseline or {}).get('scales', {}).get(scale) or {}).get(stage)
+            base_wall = base['wall_s'] if base else None
+            ratio = result['wall_s'] / base_wall if base_wall else None
+            regression = bool(ratio and ratio > tolerance and result['wall_s'] - base_wall > min_seconds)
+            rows.append((scale, stage, result['wall_s'], base_wall, ratio, regression))
+    return rows
+
+
+# (stage, smaller scale, larger scale, growth exponent) for every stage that grows super-linearly between
+# consecutive scales of the run
+def superlinear(run, max_exponent=max_exponent, min_seconds=min_scaling_seconds):
+    flagged = []
+    ordered = sorted(run['scales'], key=int)
+    for small, large in zip(ordered[:-1], ordered[1:]):
+        for stage, result in run['scales'][large].items():
+            before = run['scales'][small].get(stage)
+            if before is None or result['wall_s'] < min_seconds or before['wall_s'] <= 0:
+                continue
+            exponent = math.log(result['wall_s'] / before['wall_s']) / math.log(int(large) / int(small))
+            if exponent >= max_exponent:
+                flagged.append((stage, small, large, exponent))
+    return flagged
+
+
+def print_comparison(rows, run):
+    print(f"{'scale':>6}  {'stage':<10}{'wall s':>9}{'cpu s':>9}{'peak MB':>9}{'base s':>9}{'ratio':>8}")
+    for scale, stage, wall, base_wall, ratio, regression in rows:
+        result = run['scales'][scale][stage]
+        base = f"{base_wall:>9.3f}" if base_wall is not None else f"{'-':>9}"
+        ratio_text = f"{ratio:>8.2f}" if ratio is not None else f"{'-':>8}"
+        print(f"{'x' + scale:>6}  {stage:<10}{wall:>9.3f}{result['cpu_s']:>9.3f}{result['peak_rss_mb']:>9.1f}"
+              f"{base}{ratio_text}{'  REGRESSION' if regression else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('scales', nargs='*', type=int, default=scales)
+    parser.add_argument('--repeats', type=int, default=repeats)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--check', action='store_true', help='exit with status 1 when a stage regressed')
+    parser.add_argument('--tolerance', type=float, default=tolerance)
+    args = parser.parse_args()
+
+    run = {'date': datetime.now().isoformat(timespec='seconds'), 'commit': commit(), 'repeats': args.repeats,
+           'scales': {str(scale): bench_scale(scale, args.repeats) for scale in args.scales}}
+
+    os.makedirs(paths.benchmark_dir, exist_ok=True)
+    with open(paths.benchmark_history_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run) + '\n')
+
+    baseline = load_baseline()
+    rows = compare(run, baseline, args.tolerance)
+    if baseline:
+        print(f"Baseline: {baseline['date']} (commit {baseline['commit']})")
+    print_comparison(rows, run)
+
+    flagged = superlinear(run)
+    for stage, small, large, exponent in flagged:
+        print(f"{stage}: wall time grows like scale ** {exponent:.2f} from x{small} to x{large} (super-linear)")
+    if args.save_baseline:
+        if flagged:
+            print("Baseline not saved: a super-linear stage would be frozen into it")
+        else:
+            with open(paths.benchmark_baseline_path, 'w', encoding='utf-8') as f:
+                json.dump(run, f, indent=1)
+            print(f"Baseline saved to {paths.benchmark_baseline_path}")
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower than the baseline by more than {args.tolerance}x")
+    if (regressions or flagged) and args.check:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark the sequential scraper against the concurrent fetch engine, offline
+
+Serves Spotrac-like pages rendered from a saved contract CSV on a local HTTP server with simulated
+latency, runs both scrapers against it and checks the output CSVs are identical.
+
+Usage: python bench_scrape.py [contract_csv] [latency_seconds]
+
+Author: Kevin Kang
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import get_data
+import paths
+from spotrac_fixtures import LocalSpotrac, write_site
+
+contract_csv = sys.argv[1] if len(sys.argv) > 1 else paths.contract_path('2024-09-19')
+latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+
+# The original one-request-at-a-time loop, with a fresh connection per request
+def run_sequential(base_url, output_dir):
+    combined_player_data = []
+    for team_slug, team_name in get_data.teams.items():
+        for player in get_data.scrape_team_page(base_url.format(team_slug)):
+            contract_data = get_data.scrape_player_profile(player)
+            if contract_data:
+                contract_data['team_name'] = team_name
+                combined_player_data.append(contract_data)
+
+    combined_df = pd.DataFrame(combined_player_data)
+    combined_df.replace({'\\$': '', ',': '', '%': ''}, regex=True, inplace=True)
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, 'sequential.csv')
+    combined_df.to_csv(output_file, index=False)
+    return output_file
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        html_dir = os.path.join(tmp, 'site')
+        os.makedirs(html_dir)
+        with LocalSpotrac(html_dir, latency=latency) as site:
+            write_site(contract_csv, html_dir, site.host)
+            base_url = site.host + '/nhl/{}/cap/'
+
+            start = time.perf_counter()
+            sequential_file = run_sequential(base_url, os.path.join(tmp, 'sequential'))
+            sequential_time = time.perf_counter() - start
+
+            results = {}
+            for workers in (8, 32):
+                start = time.perf_counter()
+                output_dir = os.path.join(tmp, f'workers_{workers}')
+                get_data.main(base_url=base_url, store_dir=os.path.join(output_dir, 'snapshots'), max_workers=workers,
+                              rate_limit=None, cache_dir=None, export_dir=output_dir)
+                results[workers] = (time.perf_counter() - start, paths.contract_path(get_data.today, output_dir))
+
+        with open(sequential_file, 'rb') as f:
+            expected = f.read()
+
+        print(f"\nPages served with {latency * 1000:.0f} ms simulated latency")
+        print(f"{'mode':<24}{'seconds':>10}{'speedup':>10}  identical")
+        print(f"{'sequential (original)':<24}{sequential_time:>10.2f}{1.0:>10.1f}  -")
+        for workers, (seconds, output_file) in results.items():
+            with open(output_file, 'rb') as f:
+                identical = f.read() == expected
+            print(f"{f'pooled, {workers} workers':<24}{seconds:>10.2f}{sequential_time / seconds:>10.1f}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
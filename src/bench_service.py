@@ -0,0 +1,117 @@
+"""
+Load test for roster_service.py: concurrent what-if queries against a local instance
+
+Starts the service in a subprocess (or uses --url), sends a mix of queries (random caps, locked and
+excluded players, profiles and position counts) from several client threads, and prints client-side
+throughput and p50/p99 latency next to the service's own /metrics.
+
+Usage: python bench_service.py [--url URL] [--requests N] [--concurrency C] [--workers W] [--solver cbc|exact]
+
+Author: Kevin Kang
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import paths
+import roster_service
+
+
+def call(url, path, query=None):
+    data = json.dumps(query).encode() if query is not None else None
+    request = urllib.request.Request(url + path, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+# A random what-if query over the players in the merged pool
+def random_query(rng, players, profiles, solver):
+    query = {'cap': float(rng.choice(np.linspace(70e6, 95e6, 11))), 'solver': solver}
+    if rng.random() < 0.5:
+        query['lock'] = rng.choice(players, size=rng.integers(1, 3), replace=False).tolist()
+    if rng.random() < 0.3:
+        query['exclude'] = rng.choice(players, size=rng.integers(1, 4), replace=False).tolist()
+    if rng.random() < 0.5:
+        query['profile'] = str(rng.choice(profiles))
+    if rng.random() < 0.2:
+        query['sizes'] = {'forwards': 13, 'defensemen': 7}
+    return query
+
+
+# Start a local instance and wait until it answers
+def start_service(port, workers):
+    process = subprocess.Popen([sys.executable, roster_service.__file__, '--port', str(port),
+                                '--workers', str(workers)], stdout=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(600):
+        try:
+            call(url, '/health')
+            return process, url
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("The service did not start")
+
+
+def run(url, n_requests, concurrency, solver, seed=0):
+    rng = np.random.default_rng(seed)
+    players = pd.read_csv(paths.merged_path)['player'].drop_duplicates().to_numpy()
+    profiles = call(url, '/health')[1]['profiles']
+    queries = [random_query(rng, players, profiles, solver) for _ in range(n_requests)]
+
+    def timed_call(query):
+        start = time.perf_counter()
+        status, _ = call(url, '/roster', query)
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_call, queries))
+    elapsed = time.perf_counter() - start
+
+    statuses = pd.Series([status for status, _ in results]).value_counts().sort_index()
+    latencies = np.array([seconds for _, seconds in results]) * 1e3
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{n_requests} requests, concurrency {concurrency}, solver {solver}: {elapsed:.2f} s, "
+          f"{n_requests / elapsed:.1f} req/s")
+    print(f"status counts: {statuses.to_dict()}")
+    print(f"client latency ms: p50 {p50:.1f}  p99 {p99:.1f}  max {latencies.max():.1f}")
+    print(f"service metrics: {json.dumps(call(url, '/metrics')[1], indent=1)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--url', help="a running service (default: start one locally)")
+    parser.add_argument('--port', type=int, default=roster_service.default_port + 1)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=roster_service.default_workers)
+    parser.add_argument('--solver', choices=roster_service.solvers, default='cbc')
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_service(args.port, args.workers)
+    try:
+        run(url, args.requests, args.concurrency, args.solver)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark load time and peak memory of CSV vs Parquet vs Feather on a 100x copy of player_stats_23_24.csv
+
+The synthetic table repeats every row 100 times with renamed players and slightly jittered stats (so
+the copies do not compress away). Each load runs in a fresh process, reading either every column or
+only the columns the CPS calculation needs, and reports the time and the peak RSS above the
+process's resident memory before the load (Linux).
+
+Usage: python bench_storage.py [scale] [repeats]
+
+Author: Kevin Kang
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import cps
+import paths
+from instrument import reset_peak_rss, rss_mb
+from storage import apply_schema, read_table, schemas, write_table
+
+scale = 100
+repeats = 3
+projected_columns = ['Player', 'Position'] + [column for column in cps.skater_input_columns if column != 'plus_minus']
+
+
+def synthetic_player_stats(scale, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(paths.player_stats_path)
+    copies = pd.concat([df] * scale, ignore_index=True)
+    copies['Player'] = copies['Player'] + ' ' + np.repeat(np.arange(scale), len(df)).astype(str)
+    for column in df.select_dtypes('number').columns:
+        jitter = rng.normal(1, 0.01, size=len(copies))
+        copies[column] = (copies[column] * jitter).round(2) if df[column].dtype == float else copies[column]
+    return copies
+
+
+# Run in a child process: load `path` (CSV coerced to the schema), print seconds and peak RSS growth
+def measure(path, columns):
+    reset_peak_rss()
+    baseline, _ = rss_mb()
+    start = time.perf_counter()
+    df = read_table(path, columns or None, schemas['raw_player_stats'])
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed} {rss_mb()[1] - baseline} {len(df)}")
+
+
+def run_child(path, columns, repeats=repeats):
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, __file__, '--measure', path, ','.join(columns or [])],
+                                capture_output=True, text=True, check=True).stdout.split()
+        timings.append((float(output[0]), float(output[1])))
+    return min(t for t, _ in timings), min(m for _, m in timings)
+
+
+def main():
+    n_copies = int(sys.argv[1]) if len(sys.argv) > 1 else scale
+    n_repeats = int(sys.argv[2]) if len(sys.argv) > 2 else repeats
+    df = synthetic_player_stats(n_copies)
+    print(f"{len(df)} rows x {len(df.columns)} columns")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {'csv': os.path.join(tmp, 'player_stats.csv')}
+        df.to_csv(files['csv'], index=False)
+        typed = apply_schema(df, schemas['raw_player_stats'])
+        for fmt in ('parquet', 'feather'):
+            files[fmt] = os.path.join(tmp, f'player_stats.{fmt}')
+            write_table(typed, files[fmt])
+
+        print(f"{'format':<9}{'columns':>9}{'size MB':>9}{'load s':>9}{'peak MB':>9}")
+        for fmt, path in files.items():
+            size = os.path.getsize(path) / 1e6
+            for label, columns in (('all', None), ('cps', projected_columns)):
+                elapsed, peak = run_child(path, columns, n_repeats)
+                print(f"{fmt:<9}{label:>9}{size:>9.1f}{elapsed:>9.3f}{peak:>9.1f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        measure(sys.argv[2], sys.argv[3].split(',') if len(sys.argv) > 3 and sys.argv[3] else None)
+    else:
+        main()
@@ -0,0 +1,98 @@
+"""
+Salary cap sweep: the optimal roster and total CPS at every cap in a range (the CPS-vs-cap frontier)
+
+Each worker builds its model once and walks its caps in ascending order, changing only the cap's
+right-hand side and warm-starting from the previous roster (which is still feasible at a higher cap).
+Caps are split into contiguous chunks so several processes can sweep at once.
+
+Usage: python cap_sweep.py [start] [stop] [step] [processes] [method]
+       e.g. python cap_sweep.py 70e6 100e6 250e3 4 exact
+
+Author: Kevin Kang
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import paths
+from exact_roster import solve_roster_exact
+from optimizer import InfeasibleRosterError, RosterModel, pool_arrays, roster_sizes
+
+
+def cap_range(start=70e6, stop=100e6, step=250e3):
+    return np.arange(start, stop + step / 2, step)
+
+
+# Solve one ascending run of caps, reusing the model / previous roster between them.
+# A cap too low for any roster gets None, and the sweep goes on to the next cap.
+def sweep_chunk(value, cost, masks, caps, sizes=roster_sizes, method='pulp'):
+    rosters = []
+    if method == 'exact':
+        selected = None
+        for cap in caps:
+            try:
+                selected = solve_roster_exact(value, cost, masks, cap, sizes, incumbent=selected)
+            except InfeasibleRosterError:
+                rosters.append(None)
+                continue
+            rosters.append(selected)
+        return rosters
+
+    model = RosterModel(value, cost, masks, caps[0], sizes)
+    for cap in caps:
+        model.set_cap(cap)
+        try:
+            rosters.append(model.solve())
+        except InfeasibleRosterError:
+            rosters.append(None)
+    return rosters
+
+
+# Optimal roster at every cap: a DataFrame with cap, total_cps, total_cap_hit, roster (selected indices)
+# and pareto (True where total CPS improves on every smaller cap). Infeasible caps have NaN totals and no roster.
+def cap_sweep(value, cost, masks, caps, sizes=roster_sizes, method='pulp', processes=1):
+    caps = np.sort(np.asarray(caps, dtype=float))
+    if processes > 1:
+        chunks = np.array_split(caps, processes)
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(sweep_chunk, value, cost, masks, chunk, sizes, method)
+                       for chunk in chunks if len(chunk)]
+            rosters = [roster for future in futures for roster in future.result()]
+    else:
+        rosters = sweep_chunk(value, cost, masks, caps, sizes, method)
+
+    frontier = pd.DataFrame({
+        'cap': caps,
+        'total_cps': [value[roster].sum() if roster is not None else np.nan for roster in rosters],
+        'total_cap_hit': [cost[roster].sum() if roster is not None else np.nan for roster in rosters],
+        'roster': rosters,
+    })
+    best_below = frontier['total_cps'].fillna(-np.inf).cummax().shift(fill_value=-np.inf)
+    frontier['pareto'] = frontier['total_cps'] > best_below + 1e-9
+    return frontier
+
+
+def main():
+    start = float(sys.argv[1]) if len(sys.argv) > 1 else 70e6
+    stop = float(sys.argv[2]) if len(sys.argv) > 2 else 100e6
+    step = float(sys.argv[3]) if len(sys.argv) > 3 else 250e3
+    processes = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    method = sys.argv[5] if len(sys.argv) > 5 else 'pulp'
+
+    merged_df = pd.read_csv(paths.merged_path, float_precision='round_trip')
+    value, cost, masks = pool_arrays(merged_df)
+
+    frontier = cap_sweep(value, cost, masks, cap_range(start, stop, step), method=method, processes=processes)
+    frontier['players'] = ['; '.join(merged_df['player'].iloc[roster]) if roster is not None else ''
+                           for roster in frontier['roster']]
+    frontier = frontier.drop(columns='roster')
+
+    print(frontier[['cap', 'total_cps', 'total_cap_hit', 'pareto']])
+    frontier.to_csv(paths.cap_frontier_path, index=False)
+
+
+if __name__ == '__main__':
+    main()
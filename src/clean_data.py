@@ -6,77 +6,71 @@ Author: Kevin Kang
 
 import pandas as pd
 
+import instrument
+import paths
+from name_resolution import harmonize_names
+
+
 # --- Player Stats with Plus/Minus ---
-# Load the player stats CSV file
-player_stats_file_path = '../data/raw/player_stats_23_24.csv'  
-df_player_stats = pd.read_csv(player_stats_file_path)
-
-# Load the plus/minus values from the second CSV file
-plus_minus_file_path = '../data/raw/players_plus_minus.csv'  
-df_plus_minus = pd.read_csv(plus_minus_file_path)
-
-# Rename specific player names in the plus-minus file
-rename_dict = {
-    'Mitch Marner': 'Mitchell Marner',
-    'John (Jack) Roslovic': 'Jack Roslovic',
-    'Alexander Wennberg': 'Alex Wennberg',
-    'Cameron Atkinson': 'Cam Atkinson',
-    'Janis Moser': 'J.J. Moser',
-    'Patrick Maroon': 'Pat Maroon',
-    'Jani Hakanp§§': 'Jani Hakanpää',
-    'Mathew Dumba': 'Matt Dumba',
-    'Matthew Grzelcyk': 'Matt Grzelcyk',
-    'Joshua Brown': 'Josh Brown',
-    'Gustav Lindstrom': 'Gustav Lindström',
-    'Joshua Mahura': 'Josh Mahura',
-    'Jesse Ylonen': 'Jesse Ylönen',
-    'Zachary Sanford': 'Zach Sanford',
-    'Jake Lucchini': 'Jacob Lucchini',
-    'Matt Benning': 'Matthew Benning',
-    'Maxime Lajoie': 'Max Lajoie',
-    'Maxime Comtois': 'Max Comtois',
-    'Alexander Petrovic': 'Alex Petrovic',
-    'Matthew Savoie': 'Matt Savoie',
-}
-
-# Apply the renaming
-df_plus_minus['Player'] = df_plus_minus['Player'].replace(rename_dict)
-
-# Ensure the column names are consistent. Rename the +/- column to 'plus_minus' to avoid issues with special characters.
-df_plus_minus = df_plus_minus.rename(columns={'+/-': 'plus_minus'})
-
-# Merge the two datasets based on the 'Player' column to include the plus-minus values
-merged_player_df = pd.merge(df_player_stats, df_plus_minus[['Player', 'plus_minus']], on='Player', how='left')
-
-# Display the first few rows of the merged dataframe to verify
-print("Player Stats with Plus/Minus:")
-print(merged_player_df.head())
-
-merged_player_file_path = '../data/cleaned/merged_player_stats_with_plus_minus.csv'
-merged_player_df.to_csv(merged_player_file_path, index=False)
+def clean_skater_stats(df_player_stats: pd.DataFrame, df_plus_minus: pd.DataFrame) -> pd.DataFrame:
+    # Match the plus-minus player names to the player stats names (nicknames, accents, known aliases);
+    # unmatched names are reported and keep no plus/minus value
+    df_plus_minus, _ = harmonize_names(df_plus_minus, 'Player', df_player_stats['Player'], label='plus/minus')
+
+    # Ensure the column names are consistent. Rename the +/- column to 'plus_minus' to avoid issues with special characters.
+    df_plus_minus = df_plus_minus.rename(columns={'+/-': 'plus_minus'})
+
+    # Merge the two datasets based on the 'Player' column to include the plus-minus values
+    merged_player_df = pd.merge(df_player_stats, df_plus_minus[['Player', 'plus_minus']], on='Player', how='left')
+    instrument.merge('player_stats + plus_minus', df_player_stats, df_plus_minus, merged_player_df)
+    instrument.record('skaters_without_plus_minus', int(merged_player_df['plus_minus'].isna().sum()))
+    return merged_player_df
+
 
 # --- Goalie Stats with Wins ---
-# Load the goalie stats CSV file
-goalie_stats_file_path = '../data/raw/goalie_stats_23_24.csv'  
-df_goalie_stats = pd.read_csv(goalie_stats_file_path)
+def clean_goalie_stats(df_goalie_stats: pd.DataFrame, df_wins: pd.DataFrame) -> pd.DataFrame:
+    # Ensure the column names are consistent. Rename the 'Wins' column to 'wins'
+    df_wins = df_wins.rename(columns={'W': 'wins'})
+
+    # Merge the two datasets based on the 'Player' column to include the wins values
+    merged_goalie_df = pd.merge(df_goalie_stats, df_wins[['Player', 'wins']], on='Player', how='left')
+    instrument.merge('goalie_stats + wins', df_goalie_stats, df_wins, merged_goalie_df)
+    instrument.record('goalies_without_wins', int(merged_goalie_df['wins'].isna().sum()))
+
+    # Calculate win percentage and handle division by zero if a goalie has no games played
+    merged_goalie_df['win_percentage'] = (merged_goalie_df['wins'] / merged_goalie_df['GP'].replace(0, pd.NA)) * 100
+    return merged_goalie_df
+
+
+# Both cleaned tables: (skater stats with plus/minus, goalie stats with wins)
+def clean(df_player_stats: pd.DataFrame, df_plus_minus: pd.DataFrame, df_goalie_stats: pd.DataFrame,
+          df_wins: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    return clean_skater_stats(df_player_stats, df_plus_minus), clean_goalie_stats(df_goalie_stats, df_wins)
+
+
+def main():
+    # Load the player stats and the plus/minus values
+    df_player_stats = pd.read_csv(paths.player_stats_path, float_precision='round_trip')
+    df_plus_minus = pd.read_csv(paths.plus_minus_path, float_precision='round_trip')
 
-# Load the wins data from a separate CSV file (assuming it contains player names and wins)
-wins_file_path = '../data/raw/goalie_wins_losses.csv'  
-df_wins = pd.read_csv(wins_file_path)
+    merged_player_df = clean_skater_stats(df_player_stats, df_plus_minus)
 
-# Ensure the column names are consistent. Rename the 'Wins' column to 'wins'
-df_wins = df_wins.rename(columns={'W': 'wins'})
+    # Display the first few rows of the merged dataframe to verify
+    print("Player Stats with Plus/Minus:")
+    print(merged_player_df.head())
+    merged_player_df.to_csv(paths.skater_stats_path, index=False)
 
-# Merge the two datasets based on the 'Player' column to include the wins values
-merged_goalie_df = pd.merge(df_goalie_stats, df_wins[['Player', 'wins']], on='Player', how='left')
+    # Load the goalie stats and the wins data (player names and wins)
+    df_goalie_stats = pd.read_csv(paths.goalie_stats_path, float_precision='round_trip')
+    df_wins = pd.read_csv(paths.goalie_wins_path, float_precision='round_trip')
 
-# Calculate win percentage and handle division by zero if a goalie has no games played
-merged_goalie_df['win_percentage'] = (merged_goalie_df['wins'] / merged_goalie_df['GP'].replace(0, pd.NA)) * 100
+    merged_goalie_df = clean_goalie_stats(df_goalie_stats, df_wins)
 
-# Display the first few rows of the merged dataframe to verify
-print("\nGoalie Stats with Wins:")
-print(merged_goalie_df.head())
+    # Display the first few rows of the merged dataframe to verify
+    print("\nGoalie Stats with Wins:")
+    print(merged_goalie_df.head())
+    merged_goalie_df.to_csv(paths.goalie_stats_wins_path, index=False)
 
-merged_goalie_file_path = '../data/cleaned/merged_goalie_stats_with_wins.csv'
-merged_goalie_df.to_csv(merged_goalie_file_path, index=False)
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Vectorized CPS (custom performance score) engine
+
+CPS weights live in one matrix (position x normalized metric). Every player's score is a row of a
+single matrix product, picked by the player's position, so scoring is the same few NumPy calls
+whether the pool has a thousand rows or a hundred thousand.
+
+Weight profiles are read from config/cps_profiles.json. Several profiles can be scored at once: the
+normalized metrics are computed a single time and every profile is one more slice of the product.
+
+Author: Kevin Kang
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+positions = ['C', 'L', 'R', 'D', 'G']
+
+skater_metrics = ['Goals', 'TOI', 'Total Assists', 'ixG', 'iCF', 'plus_minus_normalized', 'Takeaways',
+                  'Faceoffs %', 'Shots Blocked', 'Hits']
+goalie_metrics = ['SV%', 'GAA', 'GSAA', 'HDSV%', 'xG Against', 'Rebound Attempts Against',
+                  'scaled_win_percentage']
+metrics = skater_metrics + goalie_metrics
+
+# Weight profiles: {profile: {position: {metric: weight}}}. Positions a profile leaves out use the default
+# profile's weights, and metrics a position does not list are 0.
+profiles_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'cps_profiles.json')
+default_profile = 'default'
+
+
+def load_profiles(path=profiles_path):
+    with open(path, encoding='utf-8') as f:
+        raw_profiles = json.load(f)
+
+    profiles = {}
+    for name, profile in raw_profiles.items():
+        for position, weights in profile.items():
+            if position not in positions:
+                raise ValueError(f"Unknown position {position!r} in CPS profile {name!r}")
+            unknown = set(weights) - set(metrics)
+            if unknown:
+                raise ValueError(f"Unknown metrics {sorted(unknown)} for {position} in CPS profile {name!r}")
+        profiles[name] = {**raw_profiles.get(default_profile, {}), **profile}
+    return profiles
+
+
+position_weights = load_profiles()[default_profile]
+
+# Goalie metrics normalized before scoring, and the ones inverted because lower is better
+goalie_scaled_columns = ['SV%', 'GAA', 'GSAA', 'HDSV%', 'xG Against', 'Rebound Attempts Against', 'win_percentage', 'GP']
+goalie_inverted_columns = ['GAA', 'xG Against', 'Rebound Attempts Against']
+games_played_threshold = 10
+
+# Columns of the cleaned stats that the skater and goalie scores read
+skater_input_columns = [metric for metric in skater_metrics if metric != 'plus_minus_normalized'] + ['plus_minus']
+goalie_input_columns = goalie_scaled_columns
+
+
+def weight_matrix(weights=position_weights, columns=metrics):
+    return np.array([[weights.get(position, {}).get(metric, 0.0) for metric in columns] for position in positions])
+
+
+# Stack of weight matrices, profiles x positions x metrics
+def weight_stack(profiles, columns=metrics):
+    return np.stack([weight_matrix(weights, columns) for weights in profiles.values()])
+
+
+# Column-wise min-max scaling with the same arithmetic as sklearn's MinMaxScaler (NaNs are ignored and kept).
+# The bounds default to each column's min and max; passing kept bounds scales a subset of rows identically.
+def minmax_scale(values, data_min=None, data_max=None):
+    values = np.asarray(values, dtype=float)
+    data_min = np.nanmin(values, axis=0) if data_min is None else data_min
+    data_range = (np.nanmax(values, axis=0) if data_max is None else data_max) - data_min
+    data_range = np.where(data_range < 10 * np.finfo(float).eps, 1.0, data_range)
+    scale = 1.0 / data_range
+    return values * scale - data_min * scale
+
+
+# Index into `positions` for each player, -1 where the position has no weights
+def position_index(position_series):
+    return pd.Categorical(position_series, categories=positions).codes.astype(np.int64)
+
+
+# Score each row under every weight matrix in `weights` (profiles x positions x metrics), giving rows x profiles.
+# All profiles and positions come out of one product; each row then keeps its own position's column.
+# A missing metric only makes a score missing when the player's position actually weights it.
+# The product is an einsum rather than a BLAS matmul: BLAS may sum a row in a different order depending
+# on how many rows it is given (and einsum on the memory layout), and a row's score must not depend on which
+# other rows are scored with it.
+def score_profiles(values, pos_index, weights):
+    values = np.asarray(values, dtype=float)
+    n_profiles, n_positions, n_metrics = weights.shape
+    flat = weights.reshape(n_profiles * n_positions, n_metrics)
+
+    missing = np.isnan(values)
+    by_position = np.einsum('nm,km->nk', np.ascontiguousarray(np.where(missing, 0.0, values)), flat).reshape(len(values), n_profiles, n_positions)
+    missing_used = ((missing.astype(float) @ (flat != 0).T) > 0).reshape(len(values), n_profiles, n_positions)
+
+    pick = np.maximum(pos_index, 0)[:, None, None]
+    scores = np.take_along_axis(by_position, pick, axis=2)[:, :, 0]
+    scores[np.take_along_axis(missing_used, pick, axis=2)[:, :, 0] | (pos_index < 0)[:, None]] = np.nan
+    return scores
+
+
+def score(values, pos_index, weights):
+    return score_profiles(values, pos_index, weights[None])[:, 0]
+
+
+# For dual positions like "C, L" keep the second one
+def select_second_position(position_series):
+    dual = position_series.str.contains(',', regex=False)
+    return position_series.where(~dual, position_series.str.split(',').str[1].str.strip())
+
+
+# Normalized skater metrics, in `skater_metrics` order
+def skater_metric_values(df):
+    base = [metric for metric in skater_metrics if metric != 'plus_minus_normalized']
+    normalized = pd.DataFrame(minmax_scale(df[base].to_numpy(dtype=float)), columns=base, index=df.index)
+
+    # Shift plus_minus to positive before scaling, add abs(min value) + 1
+    plus_minus = df['plus_minus'].to_numpy(dtype=float)
+    shifted = plus_minus + abs(np.nanmin(plus_minus)) + 1
+    normalized['plus_minus_normalized'] = minmax_scale(shifted.reshape(-1, 1))[:, 0]
+    return normalized[skater_metrics].to_numpy()
+
+
+# Normalized goalie metrics, in `goalie_metrics` order
+def goalie_metric_values(df):
+    normalized = pd.DataFrame(minmax_scale(df[goalie_scaled_columns].to_numpy(dtype=float)),
+                              columns=goalie_scaled_columns, index=df.index)
+    normalized[goalie_inverted_columns] = 1 - normalized[goalie_inverted_columns]
+
+    # Scale win percentage down below the games played threshold. GP is compared after normalization,
+    # as the original row-wise version did, so this keeps the published scores unchanged.
+    games_played = normalized['GP'].to_numpy()
+    win_percentage = normalized['win_percentage'].to_numpy()
+    scaled = np.where(games_played >= games_played_threshold, win_percentage,
+                      win_percentage * (games_played / games_played_threshold))
+    normalized['scaled_win_percentage'] = minmax_scale(scaled.reshape(-1, 1))[:, 0]
+    return normalized[goalie_metrics].to_numpy()
+
+
+def skater_cps(df, weights=position_weights):
+    values = skater_metric_values(df)
+    return pd.Series(score(values, position_index(df['Position']), weight_matrix(weights, skater_metrics)),
+                     index=df.index)
+
+
+def goalie_cps(df, weights=position_weights):
+    values = goalie_metric_values(df)
+    pos_index = np.full(len(df), positions.index('G'))
+    return pd.Series(score(values, pos_index, weight_matrix(weights, goalie_metrics)), index=df.index)
+
+
+# CPS under every profile at once, as a DataFrame with one column per profile
+def skater_cps_matrix(df, profiles):
+    values = skater_metric_values(df)
+    scores = score_profiles(values, position_index(df['Position']), weight_stack(profiles, skater_metrics))
+    return pd.DataFrame(scores, columns=list(profiles), index=df.index)
+
+
+def goalie_cps_matrix(df, profiles):
+    values = goalie_metric_values(df)
+    pos_index = np.full(len(df), positions.index('G'))
+    scores = score_profiles(values, pos_index, weight_stack(profiles, goalie_metrics))
+    return pd.DataFrame(scores, columns=list(profiles), index=df.index)
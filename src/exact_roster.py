@@ -0,0 +1,191 @@
+"""
+Exact roster solver without a MILP solver
+
+The roster problem is one knapsack (cap hit against the salary cap) plus an exact count per roster
+group, which is small enough to solve directly:
+
+1. Dominance pruning: within a group that needs k players, a player with at least k others that are
+   both cheaper (or equal) and better (or equal) can never be needed, so it is dropped.
+2. Lagrangian bound: pricing the cap at lambda dollars-to-CPS, the best roster ignoring the cap is
+   the top k per group by reduced value (cps - lambda * cap_hit). The lambda minimizing that bound
+   equals the LP relaxation bound and is found by bisection on its subgradient.
+3. Branch and bound: each group is sorted by reduced value at that lambda (CPS per dollar at the
+   dual price), so the bound for any partial roster is a prefix sum lookup. A minimum-cost table
+   prunes branches that cannot fit under the cap.
+
+The result is a provably optimal roster (same objective as the PuLP model in optimizer.py).
+
+Author: Kevin Kang
+"""
+
+import heapq
+
+import numpy as np
+
+from optimizer import InfeasibleRosterError, roster_sizes, salary_cap
+
+bisection_steps = 64
+tolerance = 1e-9
+
+
+# Drop players dominated by at least k others in their group (cheaper or equal and better or equal)
+def undominated(members, value, cost, k):
+    order = members[np.lexsort((members, -value[members], cost[members]))]
+    kept = []
+    best_values = []  # Min-heap of the k best values kept so far, all cheaper or equal in cost
+    for i in order.tolist():
+        if len(best_values) == k and best_values[0] >= value[i]:
+            continue
+        kept.append(i)
+        if len(best_values) < k:
+            heapq.heappush(best_values, value[i])
+        elif value[i] > best_values[0]:
+            heapq.heapreplace(best_values, value[i])
+    return np.array(kept, dtype=np.int64)
+
+
+# Top-k by reduced value in every group at price `lam`: (bound, total cost of that choice)
+def lagrangian(groups, value, cost, cap, lam):
+    bound, spent = lam * cap, 0.0
+    for members, k in groups:
+        reduced = value[members] - lam * cost[members]
+        top = np.argpartition(-reduced, k - 1)[:k]
+        bound += reduced[top].sum()
+        spent += cost[members][top].sum()
+    return bound, spent
+
+
+# Bisection on the subgradient (cap - spent) for the price minimizing the Lagrangian bound.
+# The price returned is on the feasible side, so its top-k choice usually fits under the cap.
+def dual_price(groups, value, cost, cap):
+    _, spent = lagrangian(groups, value, cost, cap, 0.0)
+    if spent <= cap:
+        return 0.0
+    low, high = 0.0, 1.0
+    while lagrangian(groups, value, cost, cap, high)[1] > cap:
+        high *= 2
+    for _ in range(bisection_steps):
+        middle = (low + high) / 2
+        if lagrangian(groups, value, cost, cap, middle)[1] > cap:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+def top_k_at(groups, value, cost, lam):
+    chosen = []
+    for members, k in groups:
+        reduced = value[members] - lam * cost[members]
+        chosen.append(members[np.argsort(-reduced, kind='stable')[:k]])
+    return np.concatenate(chosen)
+
+
+def is_feasible(roster, cost, masks, cap, sizes):
+    roster = np.asarray(roster, dtype=np.int64)
+    if len(np.unique(roster)) != len(roster) or cost[roster].sum() > cap:
+        return False
+    return all(masks[group][roster].sum() == k for group, k in sizes.items())
+
+
+class GroupTables:
+    def __init__(self, members, k, value, cost, lam):
+        reduced = value[members] - lam * cost[members]
+        order = np.argsort(-reduced, kind='stable')
+        self.members = members[order]
+        self.k = k
+        self.value = value[self.members]
+        self.cost = cost[self.members]
+        self.reduced_prefix = np.concatenate([[0.0], np.cumsum(reduced[order])])
+
+        # min_cost[p, r]: cheapest way to pick r players from positions p onward
+        n = len(self.members)
+        self.min_cost = np.full((n + 1, k + 1), np.inf)
+        self.min_cost[:, 0] = 0.0
+        for p in range(n - 1, -1, -1):
+            self.min_cost[p, 1:] = np.minimum(self.min_cost[p + 1, 1:], self.cost[p] + self.min_cost[p + 1, :-1])
+
+
+# Indices of the players in the optimal roster; `incumbent` (indices of a feasible roster) seeds the search.
+# `locked` players are always in the roster and `excluded` players never are.
+def solve_roster_exact(value, cost, masks, cap=salary_cap, sizes=roster_sizes, incumbent=None,
+                       locked=None, excluded=None):
+    value = np.asarray(value, dtype=float)
+    cost = np.asarray(cost, dtype=float)
+
+    if locked is not None or excluded is not None:
+        # Solve for the open roster spots among the remaining players, with the locked players' cap taken out
+        locked = np.asarray(locked if locked is not None else [], dtype=np.int64)
+        excluded = np.asarray(excluded if excluded is not None else [], dtype=np.int64)
+        if np.intersect1d(locked, excluded).size:
+            raise InfeasibleRosterError("A player is both locked and excluded")
+        available = np.ones(len(value), dtype=bool)
+        available[locked] = False
+        available[excluded] = False
+
+        open_sizes = {group: k - int(masks[group][locked].sum()) for group, k in sizes.items()}
+        if min(open_sizes.values(), default=0) < 0:
+            raise InfeasibleRosterError("More players locked than roster spots")
+        open_masks = {group: masks[group] & available for group in sizes}
+        if incumbent is not None:
+            incumbent = np.setdiff1d(incumbent, locked)
+        rest = solve_roster_exact(value, cost, open_masks, cap - cost[locked].sum(), open_sizes, incumbent)
+        return np.sort(np.concatenate([locked, rest]))
+
+    groups = []
+    for group, k in sizes.items():
+        if k == 0:
+            continue
+        members = np.flatnonzero(masks[group])
+        if len(members) < k:
+            raise InfeasibleRosterError(f"Only {len(members)} {group} available, {k} needed")
+        groups.append((undominated(members, value, cost, k), k))
+
+    if not groups:
+        return np.array([], dtype=np.int64)
+    if sum(np.sort(cost[members])[:k].sum() for members, k in groups) > cap:
+        raise InfeasibleRosterError("The cheapest possible roster is over the cap")
+
+    lam = dual_price(groups, value, cost, cap)
+    best, best_value = None, -np.inf
+    for candidate in (top_k_at(groups, value, cost, lam), incumbent):
+        if candidate is not None and is_feasible(candidate, cost, masks, cap, sizes):
+            candidate = np.asarray(candidate, dtype=np.int64)
+            if value[candidate].sum() > best_value:
+                best, best_value = candidate, value[candidate].sum()
+
+    tables = [GroupTables(members, k, value, cost, lam) for members, k in groups]
+    # Bound and minimum cost contributed by the groups after g (each at its own top-k)
+    rest_bound = np.zeros(len(tables) + 1)
+    rest_min_cost = np.zeros(len(tables) + 1)
+    for g in range(len(tables) - 1, -1, -1):
+        rest_bound[g] = rest_bound[g + 1] + tables[g].reduced_prefix[tables[g].k]
+        rest_min_cost[g] = rest_min_cost[g + 1] + tables[g].min_cost[0, tables[g].k]
+
+    picked = []
+    state = {'best': best, 'best_value': best_value}
+
+    def search(g, p, left, total_value, total_cost):
+        if left == 0:
+            if g + 1 == len(tables):
+                if total_value > state['best_value'] + tolerance:
+                    state['best'], state['best_value'] = np.array(picked), total_value
+                return
+            g, p, left = g + 1, 0, tables[g + 1].k
+
+        table = tables[g]
+        slack = lam * (cap - total_cost) + rest_bound[g + 1]
+        for q in range(p, len(table.members) - left + 1):
+            # Reduced values are sorted, so once picking from q on cannot beat the incumbent, nothing later can
+            bound = total_value + slack + table.reduced_prefix[q + left] - table.reduced_prefix[q]
+            if bound <= state['best_value'] + tolerance:
+                break
+            new_cost = total_cost + table.cost[q]
+            if new_cost + table.min_cost[q + 1, left - 1] + rest_min_cost[g + 1] > cap:
+                continue
+            picked.append(table.members[q])
+            search(g, q + 1, left - 1, total_value + table.value[q], new_cost)
+            picked.pop()
+
+    search(0, 0, tables[0].k, 0.0, 0.0)
+    return np.sort(state['best'])
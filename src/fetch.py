@@ -0,0 +1,106 @@
+"""
+Concurrent page fetching for the scrapers: pooled keep-alive sessions, bounded parallelism,
+per-host rate limiting, retry with backoff and an optional on-disk response cache
+
+Author: Kevin Kang
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status codes worth retrying (throttling and transient server errors)
+retry_statuses = {429, 500, 502, 503, 504}
+
+
+# Spaces out requests to the same host so we never exceed `rate` requests per second
+class HostRateLimiter:
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, host):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Fetcher:
+    def __init__(self, max_workers=8, rate_limit=None, retries=3, backoff=0.5, timeout=30, cache=None):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(rate_limit)
+        self.cache = cache
+        self.requests_sent = 0
+        self.local = threading.local()
+        self.sessions = []
+        self.sessions_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    # One keep-alive session per worker thread; requests.Session is not safe to share across threads
+    def session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self.local.session = session
+            with self.sessions_lock:
+                self.sessions.append(session)
+        return session
+
+    # GET a url, answering from the response cache when one is configured
+    def get(self, url):
+        if self.cache is not None:
+            return self.cache.get(url, self.fetch)
+        return self.fetch(url)
+
+    # GET over the network, retrying connection errors and retryable statuses with exponential backoff
+    def fetch(self, url, headers=None):
+        host = urlparse(url).netloc
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.wait(host)
+            with self.sessions_lock:
+                self.requests_sent += 1
+            try:
+                response = self.session().get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in retry_statuses or attempt == self.retries:
+                    return response
+            time.sleep(self.backoff * 2 ** attempt)
+
+    # Apply `fn` to every item on the worker pool, returning results in input order
+    def map(self, fn, items):
+        return list(self.executor.map(fn, items))
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        with self.sessions_lock:
+            for session in self.sessions:
+                session.close()
+            self.sessions.clear()
+        if self.cache is not None:
+            self.cache.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
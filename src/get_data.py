@@ -5,11 +5,18 @@ Author: Kevin Kang
 """
 
 import os
+import re
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
 
+import instrument
+import paths
+from fetch import Fetcher
+from http_cache import HttpCache
+from snapshots import SnapshotStore
+import spotrac_parse
+
 # Get today's date and format it
 today = datetime.today().strftime('%Y-%m-%d')
 
@@ -50,25 +57,42 @@ teams = {
 }
 base_url = "https://www.spotrac.com/nhl/{}/cap/"
 
+# Concurrency settings for the fetch engine (max_workers=1 gives a sequential run)
+max_workers = 8
+requests_per_second = 10  # Per host
+
+# On-disk response cache (None disables it)
+cache_dir = os.path.join(paths.cache_dir, "http")
+
+# Incremental mode: a profile is re-fetched only for new players or when one of these team page columns changed
+change_fields = ['cap_hit', 'base_salary', 'signing_bonus']
+profile_fields = ['contract_start_year', 'contract_years_signed', 'contract_years_left', 'free_agent_year',
+                  'salary_signed', 'status_after_contract', 'age', 'birthday', 'experience', 'country',
+                  'college', 'drafted']
+
+# Download a page, through the shared fetcher when one is given
+def fetch_page(url, fetcher=None):
+    if fetcher is None:
+        return requests.get(url).content
+    return fetcher.get(url).content
+
 # Step 1: Scrape the Team Salary Page
-def scrape_team_page(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
+def scrape_team_page(url, fetcher=None):
+    return parse_team_page(fetch_page(url, fetcher))
 
+def parse_team_page(content, backend=None):
     player_data = []
-    table = soup.find('table', {'class': 'table-internal-sort'})
-    rows = table.find_all('tr')
+    rows = spotrac_parse.team_rows(content, backend)
 
     for row in rows[1:]:  # Skip header row
         try:
-            player_name = row.find('a').text
-            player_url = row.find('a')['href']
+            player_name, player_url = row['link']
             full_url = player_url
-            cols = row.find_all('td')
-            cap_hit = cols[2].text.strip()
-            cap_hit_pct = cols[4].text.strip()
-            base_salary = cols[5].text.strip()
-            signing_bonus = cols[6].text.strip()
+            cols = row['cells']
+            cap_hit = cols[2].strip()
+            cap_hit_pct = cols[4].strip()
+            base_salary = cols[5].strip()
+            signing_bonus = cols[6].strip()
 
             player_data.append({
                 'name': player_name, 
@@ -84,17 +108,20 @@ def scrape_team_page(url):
     return player_data
 
 # Step 2: Scrape Each Player's Profile for Contract Details and Additional Information
-def scrape_player_profile(player):
-    response = requests.get(player['url'])
-    soup = BeautifulSoup(response.content, 'html.parser')
+def scrape_player_profile(player, fetcher=None):
+    return parse_player_profile(player, fetch_page(player['url'], fetcher))
+
+def parse_player_profile(player, content, backend=None):
+    # All labeled fields come from a single walk over the page
+    fields = spotrac_parse.profile_fields(content, backend)
 
     try:
-        contract_term = soup.find(text='Contract Terms:').find_next('div').text
+        contract_term = fields['Contract Terms:']
         contract_years_signed = int(contract_term.split(" ")[0])
 
         salary_signed = contract_term.split("/")[1].strip()
         
-        free_agent_info = soup.find(text='Free Agent:').find_next('div').text.split("/")
+        free_agent_info = fields['Free Agent:'].split("/")
         free_agent_year = int(free_agent_info[0].strip())
         free_agent_status = free_agent_info[1].strip()
 
@@ -104,36 +131,18 @@ def scrape_player_profile(player):
 
         player_age_info = None
         birthday = None
-        experience = None
-        country = None
-        college = None
-        drafted = None
 
-        try:
-            player_age_info = soup.find(text='Age:').find_next('span').text.strip()
-            birthday = player_age_info.split('(')[1].replace(')', '')
-        except:
-            pass
-
-        try:
-            experience = soup.find(text='Exp:').find_next('span').text.strip()
-        except:
-            pass
+        if 'Age:' in fields:
+            player_age_info = fields['Age:'].strip()
+            try:
+                birthday = player_age_info.split('(')[1].replace(')', '')
+            except IndexError:
+                pass
 
-        try:
-            country = soup.find(text='Country:').find_next('span').text.strip()
-        except:
-            pass
-
-        try:
-            college = soup.find(text='College:').find_next('span').text.strip()
-        except:
-            pass
-
-        try:
-            drafted = soup.find(text='Drafted:').find_next('span').text.strip()
-        except:
-            pass
+        experience = fields['Exp:'].strip() if 'Exp:' in fields else None
+        country = fields['Country:'].strip() if 'Country:' in fields else None
+        college = fields['College:'].strip() if 'College:' in fields else None
+        drafted = fields['Drafted:'].strip() if 'Drafted:' in fields else None
 
         player['contract_start_year'] = contract_start_year
         player['contract_years_signed'] = contract_years_signed
@@ -154,35 +163,92 @@ def scrape_player_profile(player):
         print(f"Error scraping contract data for {player['name']}: {e}")
         return None
 
-def main():
+# Strip the formatting the final CSV drops, so raw team page values compare with saved ones
+def clean_value(value):
+    return re.sub(r'[\$,%]', '', str(value)).strip()
+
+# Load the most recent contract snapshot as {player url: row}, keeping every value exactly as saved
+def load_previous_snapshot(store):
+    if not store.dates():
+        return {}
+    previous_df = store.load(raw=True)
+    return {row['url']: row for row in previous_df.to_dict('records')}
+
+# Fill in profile fields from the previous snapshot if the player's team page row is unchanged
+def reuse_profile(player, previous):
+    row = previous.get(player['url'])
+    if row is None or any(clean_value(player[field]) != clean_value(row[field]) for field in change_fields):
+        return None
+    for field in profile_fields:
+        player[field] = row[field] if row[field] != '' else None
+    return player
+
+# Scrape every team page and player profile into one contract DataFrame (the pipeline's "get" stage).
+# `previous` is {player url: row} from an earlier scrape; unchanged profiles are reused from it.
+def scrape_contracts(base_url=base_url, max_workers=max_workers, rate_limit=requests_per_second, cache_dir=cache_dir,
+                     previous=None) -> pd.DataFrame:
     combined_player_data = []  # To hold data for all players
-
-    for team_slug, team_name in teams.items():
-        team_url = base_url.format(team_slug)
-        print(f"Scraping data for team: {team_name}")
-        
-        player_data = scrape_team_page(team_url)
-
-        for player in player_data:
-            print(f"  Scraping data for {player['name']}...")
-            contract_data = scrape_player_profile(player)
-            if contract_data:
-                contract_data['team_name'] = team_name
-                combined_player_data.append(contract_data)
+    previous = previous or {}
+    cache = HttpCache(cache_dir) if cache_dir else None
+
+    with Fetcher(max_workers=max_workers, rate_limit=rate_limit, cache=cache) as fetcher:
+        # Fetch all team pages in parallel; results come back in team order
+        print(f"Scraping data for {len(teams)} teams")
+        team_pages = fetcher.map(lambda slug: scrape_team_page(base_url.format(slug), fetcher), teams)
+
+        roster = []
+        for team_name, player_data in zip(teams.values(), team_pages):
+            roster.extend((player, team_name) for player in player_data)
+
+        # Reuse unchanged profiles, then fetch the rest in parallel, keeping the sequential output order
+        reused = [reuse_profile(player, previous) for player, _ in roster]
+        pending = [entry for entry, profile in zip(roster, reused) if profile is None]
+
+        def scrape(entry):
+            player, team_name = entry
+            print(f"  Scraping data for {player['name']} ({team_name})...")
+            return scrape_player_profile(player, fetcher)
+
+        fetched = iter(fetcher.map(scrape, pending))
+        profiles = [profile if profile is not None else next(fetched) for profile in reused]
+
+    print(f"{len(roster) - len(pending)} unchanged profiles reused, {len(pending)} fetched, "
+          f"{fetcher.requests_sent} HTTP requests sent")
+    instrument.count('team_pages', len(team_pages))
+    instrument.count('profiles_reused', len(roster) - len(pending))
+    instrument.count('profiles_fetched', len(pending))
+    instrument.count('http_requests', fetcher.requests_sent)
+    if cache is not None:
+        for name, n in cache.stats.items():
+            instrument.count(f'http_cache_{name}', n)
+
+    for contract_data, (_, team_name) in zip(profiles, roster):
+        if contract_data:
+            contract_data['team_name'] = team_name
+            combined_player_data.append(contract_data)
 
     combined_df = pd.DataFrame(combined_player_data)
     combined_df.replace({'\$': '', ',': '', '%': ''}, regex=True, inplace=True)
-
-    output_dir = "../data/raw"  
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Save the combined data to a CSV file in the specified directory
-    combined_file_name = os.path.join(output_dir, f'all_player_contract_data_{today}.csv')
-    combined_df.to_csv(combined_file_name, index=False)
-
-    print(f"Combined data saved as {combined_file_name}")
+    return combined_df
+
+# Scrape and save the result as today's contract snapshot (see snapshots.py); `export_dir` also writes the
+# dated CSV there. Returns the snapshot date.
+def main(base_url=base_url, store_dir=paths.snapshot_dir, max_workers=max_workers, rate_limit=requests_per_second,
+         cache_dir=cache_dir, incremental=False, export_dir=None):
+    store = SnapshotStore(store_dir)
+    previous = load_previous_snapshot(store) if incremental else {}
+    combined_df = scrape_contracts(base_url, max_workers, rate_limit, cache_dir, previous)
+
+    snapshot_date = store.save(combined_df, today)
+    print(f"Contract snapshot saved for {snapshot_date} in {store_dir}")
+
+    if export_dir:
+        # Save the combined data to a CSV file in the specified directory
+        os.makedirs(export_dir, exist_ok=True)
+        combined_file_name = paths.contract_path(snapshot_date, export_dir)
+        combined_df.to_csv(combined_file_name, index=False)
+        print(f"Combined data saved as {combined_file_name}")
+    return snapshot_date
 
 if __name__ == '__main__':
     main()
-
-
@@ -0,0 +1,158 @@
+"""
+On-disk HTTP response cache for the scrapers
+
+Bodies are stored content-addressed (by SHA-256 of the body) so identical pages share one file, and
+an index keyed by URL keeps the validators (ETag / Last-Modified) needed to revalidate with a
+conditional GET. Entries younger than the TTL are served without touching the network, and the
+least recently used entries are evicted once the cache grows past its size limit.
+
+Author: Kevin Kang
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+# Minimal stand-in for requests.Response when a page is served from the cache
+class CachedResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+        self.from_cache = True
+
+
+class HttpCache:
+    def __init__(self, cache_dir, ttl=6 * 3600, max_bytes=500 * 1024 ** 2):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.lock = threading.Lock()
+        self.stats = {'fresh_hits': 0, 'revalidated': 0, 'misses': 0, 'evicted': 0}
+
+        os.makedirs(os.path.join(cache_dir, 'bodies'), exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    def body_path(self, digest):
+        return os.path.join(self.cache_dir, 'bodies', digest[:2], digest)
+
+    def read_body(self, entry):
+        try:
+            with open(self.body_path(entry['digest']), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    # Look up a URL: returns (body, None) when fresh, (None, headers) to revalidate, (None, {}) on a miss
+    def lookup(self, url):
+        with self.lock:
+            entry = self.index.get(url)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None, {}
+            entry['last_access'] = time.time()
+            entry = dict(entry)
+
+        body = self.read_body(entry)
+        if body is None:
+            with self.lock:
+                self.stats['misses'] += 1
+            return None, {}
+
+        if time.time() - entry['fetched_at'] < self.ttl:
+            with self.lock:
+                self.stats['fresh_hits'] += 1
+            return body, None
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return None, headers
+
+    # The server answered 304 Not Modified: restart the entry's TTL and return the cached body
+    def revalidated(self, url):
+        with self.lock:
+            entry = self.index[url]
+            entry['fetched_at'] = entry['last_access'] = time.time()
+            self.stats['revalidated'] += 1
+            entry = dict(entry)
+        return self.read_body(entry)
+
+    def store(self, url, response):
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.body_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        now = time.time()
+        with self.lock:
+            self.index[url] = {
+                'digest': digest,
+                'size': len(body),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': now,
+                'last_access': now,
+            }
+
+    # Fetch through the cache with `fetch(url, headers)` returning a requests.Response
+    def get(self, url, fetch):
+        body, headers = self.lookup(url)
+        if body is not None:
+            return CachedResponse(body)
+
+        response = fetch(url, headers)
+        if response.status_code == 304 and headers:
+            body = self.revalidated(url)
+            if body is not None:
+                return CachedResponse(body)
+            response = fetch(url, {})
+        if response.status_code == 200:
+            self.store(url, response)
+        return response
+
+    # Drop least recently used URLs until the bodies fit in max_bytes, then delete orphaned bodies
+    def evict(self):
+        with self.lock:
+            sizes = {entry['digest']: entry['size'] for entry in self.index.values()}
+            refs = Counter(entry['digest'] for entry in self.index.values())
+            total = sum(sizes.values())
+            if total > self.max_bytes:
+                for url, entry in sorted(self.index.items(), key=lambda item: item[1]['last_access']):
+                    del self.index[url]
+                    self.stats['evicted'] += 1
+                    refs[entry['digest']] -= 1
+                    if not refs[entry['digest']]:
+                        total -= sizes[entry['digest']]
+                    if total <= self.max_bytes:
+                        break
+            live = {entry['digest'] for entry in self.index.values()}
+
+        bodies_dir = os.path.join(self.cache_dir, 'bodies')
+        for prefix in os.listdir(bodies_dir):
+            for digest in os.listdir(os.path.join(bodies_dir, prefix)):
+                if digest not in live:
+                    os.remove(os.path.join(bodies_dir, prefix, digest))
+
+    def save(self):
+        self.evict()
+        with self.lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_path)
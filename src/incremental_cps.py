@@ -0,0 +1,280 @@
+"""
+Incremental CPS: keep every player's score current as stat rows change, without rescoring the pool
+
+A full CPS pass min-max normalizes every metric column, so one player's new stats can move every
+other player's score, but only when they move a column's min or max. The scorer keeps the raw metric
+columns, their current min and max, the normalized values and the scores. An update writes the new
+rows, then:
+
+- if no column bound moved, normalizes and rescores only the changed rows (O(changed));
+- if a bound moved, renormalizes just the affected metric columns for every row in one vectorized
+  pass, then rescores the pool.
+
+A bound held by a changed row is re-read from its column. Scores come out bit-for-bit equal to
+cps.skater_cps_matrix / cps.goalie_cps_matrix on the updated table: the same minmax_scale arithmetic
+runs with the kept bounds, and score_profiles scores a row the same whatever rows come with it.
+
+Usage: python incremental_cps.py [updates] [rows per update]
+       (replays random stat updates on the cleaned stats, checking every result against a full recompute)
+
+Author: Kevin Kang
+"""
+
+import sys
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+import cps
+import paths
+
+
+# Move `low`/`high` (per column) to cover the `rows` of `raw` that held `old` in `columns`. A bound that a
+# changed row held is re-read from the whole column. Returns the columns whose bounds moved.
+def update_bounds(raw, low, high, rows, old, columns):
+    columns = np.asarray(columns, dtype=np.int64)
+    new = raw[np.ix_(rows, columns)]
+    changed = ~((new == old) | (np.isnan(new) & np.isnan(old)))
+
+    with np.errstate(invalid='ignore'):
+        new_low = np.fmin(low[columns], np.fmin.reduce(new, axis=0))
+        new_high = np.fmax(high[columns], np.fmax.reduce(new, axis=0))
+    stale_low = ((old == low[columns]) & changed).any(axis=0)
+    stale_high = ((old == high[columns]) & changed).any(axis=0)
+    if stale_low.any():
+        new_low[stale_low] = np.nanmin(raw[:, columns[stale_low]], axis=0)
+    if stale_high.any():
+        new_high[stale_high] = np.nanmax(raw[:, columns[stale_high]], axis=0)
+
+    moved = ~(same(new_low, low[columns]) & same(new_high, high[columns]))
+    low[columns], high[columns] = new_low, new_high
+    return columns[moved].tolist()
+
+
+def same(a, b):
+    return (a == b) | (np.isnan(a) & np.isnan(b))
+
+
+class IncrementalCPS(ABC):
+    """CPS of one stats table under every profile, updated in place as rows change"""
+
+    # Raw columns read from the stats, and the normalized metrics scored (cps metric order)
+    input_columns = []
+    metric_columns = []
+
+    def __init__(self, df, profiles=None):
+        profiles = profiles or cps.load_profiles()
+        self.profiles = list(profiles)
+        self.weights = cps.weight_stack(profiles, self.metric_columns)
+        self.labels = list(df.index)
+        self.rows = {label: row for row, label in enumerate(self.labels)}
+
+        self.raw = df[self.input_columns].to_numpy(dtype=float, copy=True)
+        self.low = np.nanmin(self.raw, axis=0)
+        self.high = np.nanmax(self.raw, axis=0)
+        self.pos_index = self.positions(df)
+        self.values = self.normalize(np.arange(len(self.raw)), self.metric_columns)
+        self.scores = cps.score_profiles(self.values, self.pos_index, self.weights)
+
+    # Position index per row of `df`
+    @abstractmethod
+    def positions(self, df):
+        ...
+
+    # Normalized `metrics` for `rows`, with the current bounds
+    @abstractmethod
+    def normalize(self, rows, metrics):
+        ...
+
+    # Metrics to renormalize for every row once the bounds of `moved` (input column indices) changed
+    @abstractmethod
+    def affected_metrics(self, rows, moved):
+        ...
+
+    # Rows for `labels`; labels not seen before are appended as new players
+    def locate(self, labels):
+        new = [label for label in dict.fromkeys(labels) if label not in self.rows]
+        if new:
+            start = len(self.labels)
+            self.labels.extend(new)
+            self.rows.update({label: start + i for i, label in enumerate(new)})
+            self.raw = np.vstack([self.raw, np.full((len(new), self.raw.shape[1]), np.nan)])
+            self.values = np.vstack([self.values, np.full((len(new), self.values.shape[1]), np.nan)])
+            self.scores = np.vstack([self.scores, np.full((len(new), self.scores.shape[1]), np.nan)])
+            self.pos_index = np.concatenate([self.pos_index, np.full(len(new), -1)])
+        return np.array([self.rows[label] for label in labels], dtype=np.int64)
+
+    # Apply `changes`: rows indexed like the original table, with any of the input columns (and Position for
+    # skaters). New index labels are added as players. Returns how many rows were rescored.
+    def update(self, changes):
+        rows = self.locate(changes.index)
+        columns = [self.input_columns.index(column) for column in changes.columns if column in self.input_columns]
+        old = self.raw[np.ix_(rows, columns)]
+        self.raw[np.ix_(rows, columns)] = changes[[self.input_columns[j] for j in columns]].to_numpy(dtype=float)
+        if 'Position' in changes:
+            self.pos_index[rows] = self.positions(changes)
+
+        moved = update_bounds(self.raw, self.low, self.high, rows, old, columns)
+        affected = self.affected_metrics(rows, moved)
+        if affected:
+            metric_index = [self.metric_columns.index(metric) for metric in affected]
+            self.values[:, metric_index] = self.normalize(np.arange(len(self.raw)), affected)
+        self.values[rows] = self.normalize(rows, self.metric_columns)
+
+        if affected:
+            self.scores = cps.score_profiles(self.values, self.pos_index, self.weights)
+            return len(self.scores)
+        self.scores[rows] = cps.score_profiles(self.values[rows], self.pos_index[rows], self.weights)
+        return len(rows)
+
+    # Scores as a DataFrame with one column per profile, like cps.skater_cps_matrix
+    def frame(self):
+        return pd.DataFrame(self.scores, columns=self.profiles, index=pd.Index(self.labels))
+
+
+class SkaterCPS(IncrementalCPS):
+    input_columns = cps.skater_input_columns
+    metric_columns = cps.skater_metrics
+
+    def positions(self, df):
+        return cps.position_index(df['Position'])
+
+    def normalize(self, rows, metrics):
+        columns = []
+        for metric in metrics:
+            if metric == 'plus_minus_normalized':
+                # plus_minus is shifted by abs(min) + 1 before scaling, so its bounds shift with it
+                j = self.input_columns.index('plus_minus')
+                shift = abs(self.low[j])
+                columns.append(cps.minmax_scale(self.raw[rows, j] + shift + 1,
+                                                self.low[j] + shift + 1, self.high[j] + shift + 1))
+            else:
+                j = self.input_columns.index(metric)
+                columns.append(cps.minmax_scale(self.raw[rows, j], self.low[j], self.high[j]))
+        return np.column_stack(columns)
+
+    def affected_metrics(self, rows, moved):
+        names = [self.input_columns[j] for j in moved]
+        return [metric for metric in self.metric_columns
+                if (metric if metric != 'plus_minus_normalized' else 'plus_minus') in names]
+
+
+class GoalieCPS(IncrementalCPS):
+    """Goalie CPS; scaled_win_percentage is min-max scaled a second time, so its bounds are kept too"""
+
+    input_columns = cps.goalie_input_columns
+    metric_columns = cps.goalie_metrics
+
+    def __init__(self, df, profiles=None):
+        self.win = None
+        super().__init__(df, profiles)
+
+    def positions(self, df):
+        return np.full(len(df), cps.positions.index('G'))
+
+    # Win percentage scaled down below the games played threshold, before its own min-max scaling
+    def scaled_win(self, rows):
+        games_played = self.scaled(rows, 'GP')
+        win_percentage = self.scaled(rows, 'win_percentage')
+        return np.where(games_played >= cps.games_played_threshold, win_percentage,
+                        win_percentage * (games_played / cps.games_played_threshold))
+
+    def scaled(self, rows, column):
+        j = self.input_columns.index(column)
+        return cps.minmax_scale(self.raw[rows, j], self.low[j], self.high[j])
+
+    def normalize(self, rows, metrics):
+        if self.win is None:
+            # First pass: the scaled win percentage of every row and its bounds
+            self.win = self.scaled_win(rows).reshape(-1, 1)
+            self.win_low, self.win_high = np.nanmin(self.win, axis=0), np.nanmax(self.win, axis=0)
+
+        columns = []
+        for metric in metrics:
+            if metric == 'scaled_win_percentage':
+                columns.append(cps.minmax_scale(self.win[rows, 0], self.win_low[0], self.win_high[0]))
+            elif metric in cps.goalie_inverted_columns:
+                columns.append(1 - self.scaled(rows, metric))
+            else:
+                columns.append(self.scaled(rows, metric))
+        return np.column_stack(columns)
+
+    def affected_metrics(self, rows, moved):
+        names = [self.input_columns[j] for j in moved]
+        if len(self.win) < len(self.raw):
+            self.win = np.vstack([self.win, np.full((len(self.raw) - len(self.win), 1), np.nan)])
+
+        # The pre-scaling win percentage changes for every row when GP or win_percentage bounds move
+        if 'GP' in names or 'win_percentage' in names:
+            self.win[:, 0] = self.scaled_win(np.arange(len(self.raw)))
+            low, high = np.nanmin(self.win, axis=0), np.nanmax(self.win, axis=0)
+            win_moved = not (same(low, self.win_low) & same(high, self.win_high)).all()
+            self.win_low, self.win_high = low, high
+        else:
+            old = self.win[rows].copy()
+            self.win[rows, 0] = self.scaled_win(rows)
+            win_moved = bool(update_bounds(self.win, self.win_low, self.win_high, rows, old, [0]))
+
+        affected = [metric for metric in self.metric_columns if metric in names]
+        if win_moved or 'GP' in names or 'win_percentage' in names:
+            affected.append('scaled_win_percentage')
+        return affected
+
+
+# Stats as integrate_data scores them
+def load_stats():
+    skaters = pd.read_csv(paths.skater_stats_path, float_precision='round_trip')
+    skaters['Position'] = cps.select_second_position(skaters['Position'])
+    goalies = pd.read_csv(paths.goalie_stats_wins_path, float_precision='round_trip')
+    return skaters.replace('-', 0), goalies.replace('-', 0)
+
+
+# Random stat changes for `n` rows of `df`: each value nudged by up to 10%, with an occasional new extreme
+def random_changes(df, columns, n, rng):
+    rows = rng.choice(df.index, size=n, replace=False)
+    changes = df.loc[rows, columns].astype(float)
+    changes *= rng.uniform(0.9, 1.1, size=changes.shape)
+    if rng.random() < 0.2:
+        column = rng.choice(columns)
+        changes.iloc[0, changes.columns.get_loc(column)] = df[column].astype(float).max() * 1.05
+    return changes
+
+
+def replay(label, scorer, df, full_matrix, profiles, n_updates, n_rows, rng):
+    df = df.astype({column: float for column in scorer.input_columns})
+    incremental = full = 0.0
+    rescored = []
+    for _ in range(n_updates):
+        changes = random_changes(df, scorer.input_columns, n_rows, rng)
+        df.loc[changes.index, changes.columns] = changes
+
+        start = time.perf_counter()
+        rescored.append(scorer.update(changes))
+        incremental += time.perf_counter() - start
+        start = time.perf_counter()
+        expected = full_matrix(df, profiles)
+        full += time.perf_counter() - start
+
+        if not np.array_equal(scorer.frame().to_numpy(), expected.to_numpy(), equal_nan=True):
+            raise AssertionError(f"{label}: incremental CPS differs from the full recompute")
+    partial = sum(n < len(df) for n in rescored)
+    print(f"{label:<8}{n_updates:>8}{partial:>9}{incremental / n_updates * 1e3:>11.3f}{full / n_updates * 1e3:>11.3f}")
+
+
+def main():
+    n_updates = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    rng = np.random.default_rng(0)
+    profiles = cps.load_profiles()
+    skaters, goalies = load_stats()
+
+    print(f"{'table':<8}{'updates':>8}{'partial':>9}{'incr ms':>11}{'full ms':>11}")
+    replay('skaters', SkaterCPS(skaters, profiles), skaters, cps.skater_cps_matrix, profiles, n_updates, n_rows, rng)
+    replay('goalies', GoalieCPS(goalies, profiles), goalies, cps.goalie_cps_matrix, profiles, n_updates, n_rows, rng)
+    print("Every update matched the full recompute")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Run instrumentation: per-stage time, memory and counts, written as a JSON run report
+
+A RunReport measures each stage it runs (wall time, CPU time, peak resident memory) and collects what
+the stage code records about itself while it is active:
+
+- count(name, n): add to a counter (HTTP requests, cache hits and misses, profiles reused)
+- record(name, value): keep a value (unmatched names, dropped players)
+- merge(name, left, right, result): rows in and out of a merge
+- timer(name): time a block inside a stage (building the model vs solving it)
+
+Outside a run these are no-ops, so the scripts behave the same when run on their own. A stage can
+also be profiled: 'cprofile' dumps a .prof file per stage and lists the top functions by cumulative
+time in the report; 'pyinstrument' (if installed) writes an HTML profile per stage.
+
+Peak memory comes from /proc (Linux): the high-water mark is reset at the start of each stage. On other
+systems the report falls back to the process's peak so far.
+
+Author: Kevin Kang
+"""
+
+import cProfile
+import json
+import os
+import platform
+import pstats
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import paths
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+profilers = ('cprofile', 'pyinstrument')
+hotspot_count = 15
+
+# The stage being measured, or None outside a run
+active = None
+
+
+# Resident memory now and its peak in MB, from /proc (ru_maxrss would include the parent's peak, inherited across exec)
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f)
+        return int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024
+    except (OSError, KeyError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform != 'darwin' else 1024 ** 2)
+        return peak, peak
+
+
+# Reset the peak (VmHWM) to the current resident size; False where that is not possible
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def count(name, n=1):
+    if active is not None:
+        active['counts'][name] = active['counts'].get(name, 0) + n
+
+
+def record(name, value):
+    if active is not None:
+        active['values'][name] = value
+
+
+def merge(name, left, right, result):
+    if active is not None:
+        active['merges'][name] = {'left_rows': len(left), 'right_rows': len(right), 'rows': len(result)}
+
+
+@contextmanager
+def timer(name):
+    stage = active
+    start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        if stage is not None:
+            stage['timers'][name] = {'wall_s': time.perf_counter() - start, 'cpu_s': time.process_time() - cpu_start}
+
+
+class RunReport:
+    """Stages measured in one run, in order; `profiler` is None, 'cprofile' or 'pyinstrument'"""
+
+    def __init__(self, profiler=None, profile_dir=paths.profile_dir):
+        if profiler not in (None, *profilers):
+            raise ValueError(f"Unknown profiler {profiler!r} (profilers: {list(profilers)})")
+        if profiler == 'pyinstrument' and pyinstrument is None:
+            raise ImportError("The pyinstrument profiler needs pyinstrument (pip install pyinstrument)")
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self.start = time.perf_counter()
+        self.stages = []
+
+    # Measure the block as stage `name`; yields the stage's entry (rows_in/rows_out can be filled in)
+    @contextmanager
+    def stage(self, name):
+        global active
+        entry = {'name': name, 'wall_s': None, 'cpu_s': None, 'peak_rss_mb': None, 'rss_growth_mb': None,
+                 'rows_in': {}, 'rows_out': {}, 'merges': {}, 'counts': {}, 'timers': {}, 'values': {}}
+        self.stages.append(entry)
+        previous, active = active, entry
+
+        peak_reset = reset_peak_rss()
+        rss_before, _ = rss_mb()
+        profiler = self.start_profiler()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield entry
+        finally:
+            entry['wall_s'] = time.perf_counter() - start
+            entry['cpu_s'] = time.process_time() - cpu_start
+            self.stop_profiler(profiler, entry)
+            rss_after, peak = rss_mb()
+            entry['peak_rss_mb'] = peak
+            entry['rss_growth_mb'] = rss_after - rss_before
+            if not peak_reset:
+                entry['values']['peak_rss_is_process_peak'] = True
+            active = previous
+
+    def start_profiler(self):
+        if self.profiler == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if self.profiler == 'pyinstrument':
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+            return profiler
+        return None
+
+    # Stop the stage's profiler, save its output and list the hotspots in the entry
+    def stop_profiler(self, profiler, entry):
+        if profiler is None:
+            return
+        os.makedirs(self.profile_dir, exist_ok=True)
+        if self.profiler == 'cprofile':
+            profiler.disable()
+            path = os.path.join(self.profile_dir, f"{entry['name']}.prof")
+            profiler.dump_stats(path)
+            stats = pstats.Stats(profiler)
+            ranked = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:hotspot_count]
+            entry['hotspots'] = [{'function': f"{os.path.basename(file)}:{line}({function})", 'calls': calls,
+                                  'tottime_s': tottime, 'cumtime_s': cumtime}
+                                 for (file, line, function), (_, calls, tottime, cumtime, _) in ranked]
+        else:
+            profiler.stop()
+            path = os.path.join(self.profile_dir, f"{entry['name']}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        entry['profile'] = path
+
+    def to_dict(self):
+        return {
+            'started': self.started,
+            'wall_s': time.perf_counter() - self.start,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'profiler': self.profiler,
+            'stages': self.stages,
+        }
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=1, default=str)
+
+    # One line per stage: time, CPU, peak memory and rows out
+    def summary(self):
+        lines = [f"{'stage':<11}{'wall s':>9}{'cpu s':>9}{'peak MB':>9}  rows out"]
+        for entry in self.stages:
+            rows = ', '.join(f"{table} {n}" for table, n in entry['rows_out'].items())
+            lines.append(f"{entry['name']:<11}{entry['wall_s']:>9.3f}{entry['cpu_s']:>9.3f}"
+                         f"{entry['peak_rss_mb']:>9.1f}  {rows}")
+        return '\n'.join(lines)
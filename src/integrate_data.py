@@ -1,128 +1,82 @@
 """
 Integrating data to form a CPS (custom performance score)
 
-note: CPS is calculated using different weights assigned to specific metrics that are relevant for each position (can be further customized)
+note: CPS is calculated using different weights assigned to specific metrics that are relevant for each position (weight profiles are set in config/cps_profiles.json)
 
 Author: Kevin Kang
 """
 
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
-
-# --- Skater CPS Calculation ---
-
-# Load the skater (player) stats dataset
-df_player_stats = pd.read_csv('../data/cleaned/merged_player_stats_with_plus_minus.csv')
-
-# Function to handle dual positions, selecting the second one if it exists
-def select_second_position(position):
-    if ',' in position:
-        return position.split(',')[1].strip()  # Select the second position
-    return position  # If no comma, return the original position
-
-# Apply the function to the 'Position' column
-df_player_stats['Position'] = df_player_stats['Position'].apply(select_second_position)
-
-# Replace any '-' with 0
-df_player_stats.replace('-', 0, inplace=True)
-
-# Normalize positive-only columns for skaters
-scaler = MinMaxScaler()
-df_player_stats[['Goals', 'TOI', 'Shots', 'Total Assists', 'Shots Blocked', 'Hits', 'Takeaways', 'Faceoffs %', 'iCF', 'ixG']] = scaler.fit_transform(
-    df_player_stats[['Goals', 'TOI', 'Shots', 'Total Assists', 'Shots Blocked', 'Hits', 'Takeaways', 'Faceoffs %', 'iCF', 'ixG']]
-)
-
-# Shift plus_minus column to positive before scaling, add abs(min value) + 1
-plus_minus_shifted = df_player_stats['plus_minus'] + abs(df_player_stats['plus_minus'].min()) + 1
-df_player_stats['plus_minus_normalized'] = scaler.fit_transform(plus_minus_shifted.values.reshape(-1, 1))
-
-# Custom Performance Score (CPS) Calculation based on position
-def calculate_cps(row):
-    # Centers (C)
-    if row['Position'] == 'C':
-        return (0.25 * row['Goals'] + 0.2 * row['TOI'] + 0.15 * row['Total Assists'] + 
-                0.1 * row['ixG'] + 0.1 * row['plus_minus_normalized'] + 
-                0.1 * row['Takeaways'] + 0.1 * row['Faceoffs %'])
-    
-    # Wingers (L & R)
-    elif row['Position'] in ['L', 'R']:
-        return (0.3 * row['Goals'] + 0.25 * row['TOI'] + 0.2 * row['Total Assists'] + 
-                0.1 * row['iCF'] + 0.1 * row['ixG'] + 0.05 * row['plus_minus_normalized'])
-    
-    # Defensemen (D)
-    elif row['Position'] == 'D':
-        return (0.25 * row['TOI'] + 0.2 * row['Shots Blocked'] + 0.15 * row['Hits'] + 
-                0.1 * row['iCF'] + 0.1 * row['plus_minus_normalized'] + 0.1 * row['Takeaways'])
-    
-    # If no match, return None
-    return None
-
-# Apply CPS calculation for skaters
-df_player_stats['cps'] = df_player_stats.apply(calculate_cps, axis=1)
-
-# Save skater CPS to CSV
-df_player_stats[['Player', 'Position', 'cps']].to_csv('../data/processed/cps/player_cps.csv', index=False)
-
-# --- Goalie CPS Calculation ---
-
-# Load the goalie stats dataset
-df_goalie_stats = pd.read_csv('../data/cleaned/merged_goalie_stats_with_wins.csv')
-
-# Replace any missing or non-numeric values (like '-') with 0
-df_goalie_stats.replace('-', 0, inplace=True)
-
-# Metrics relevant for goalie CPS
-metrics = ['SV%', 'GAA', 'GSAA', 'HDSV%', 'xG Against', 'Rebound Attempts Against', 'win_percentage', 'GP']
-
-# Normalize the relevant goalie stats columns
-df_goalie_stats[metrics] = scaler.fit_transform(df_goalie_stats[metrics])
-
-# Invert 'GAA', 'xG Against', and 'Rebound Attempts Against' since lower values are better
-df_goalie_stats['GAA'] = 1 - df_goalie_stats['GAA']
-df_goalie_stats['xG Against'] = 1 - df_goalie_stats['xG Against']
-df_goalie_stats['Rebound Attempts Against'] = 1 - df_goalie_stats['Rebound Attempts Against']
-
-# Set threshold for games played to scale win percentage
-games_played_threshold = 10
-
-# Scale win percentage if the goalie has played fewer than the threshold number of games
-df_goalie_stats['scaled_win_percentage'] = df_goalie_stats.apply(
-    lambda row: row['win_percentage'] if row['GP'] >= games_played_threshold else row['win_percentage'] * (row['GP'] / games_played_threshold),
-    axis=1
-)
-
-# Normalize the scaled win percentage
-df_goalie_stats['scaled_win_percentage'] = scaler.fit_transform(df_goalie_stats[['scaled_win_percentage']])
-
-# Calculate CPS for goalies using weighted formula
-df_goalie_stats['cps_goalie'] = (0.3 * df_goalie_stats['SV%'] +
-                                 0.2 * df_goalie_stats['GAA'] +
-                                 0.15 * df_goalie_stats['GSAA'] +
-                                 0.15 * df_goalie_stats['HDSV%'] +
-                                 0.1 * df_goalie_stats['xG Against'] +
-                                 0.05 * df_goalie_stats['Rebound Attempts Against'] +
-                                 0.05 * df_goalie_stats['scaled_win_percentage'])
-
-# Add Position for goalies
-df_goalie_stats['Position'] = 'G'
-
-# Save goalie CPS to CSV
-df_goalie_stats[['Player', 'Position', 'cps_goalie']].to_csv('../data/processed/cps/goalie_cps.csv', index=False)
-
-# --- Combine Skater and Goalie CPS Results ---
-
-# Load the skater CPS and goalie CPS datasets
-df_skaters_cps = pd.read_csv('../data/processed/cps/player_cps.csv')
-df_goalies_cps = pd.read_csv('../data/processed/cps/goalie_cps.csv')
-
-# Rename goalie CPS column for consistency
-df_goalies_cps.rename(columns={'cps_goalie': 'cps'}, inplace=True)
-
-# Combine skaters and goalies into one dataset
-df_combined_cps = pd.concat([df_skaters_cps, df_goalies_cps], ignore_index=True)
-
-# Save the combined CPS dataset to a CSV file
-df_combined_cps.to_csv('../data/processed/cps/combined_player_goalie_cps.csv', index=False)
-
-# Print the first few rows of the combined dataset
-print(df_combined_cps.head())
+
+import paths
+from cps import default_profile, goalie_cps_matrix, load_profiles, select_second_position, skater_cps_matrix
+
+
+# CPS tables from the cleaned skater and goalie stats: (skater cps, goalie cps, combined cps, cps under every profile).
+# `profiles` are the CPS weight profiles; 'default' gives the published cps, the rest are kept for comparison.
+def integrate(df_player_stats: pd.DataFrame, df_goalie_stats: pd.DataFrame, profiles=None
+              ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    profiles = profiles or load_profiles()
+
+    # --- Skater CPS Calculation ---
+    df_player_stats = df_player_stats.copy()
+
+    # Handle dual positions, selecting the second one if it exists
+    df_player_stats['Position'] = select_second_position(df_player_stats['Position'])
+
+    # Replace any '-' with 0
+    df_player_stats.replace('-', 0, inplace=True)
+
+    # Custom Performance Score (CPS) based on position: metrics are min-max normalized, then weighted
+    # per position under every profile in one vectorized pass
+    skater_profile_cps = skater_cps_matrix(df_player_stats, profiles)
+    df_player_stats['cps'] = skater_profile_cps[default_profile]
+    df_skaters_cps = df_player_stats[['Player', 'Position', 'cps']]
+
+    # --- Goalie CPS Calculation ---
+    df_goalie_stats = df_goalie_stats.copy()
+
+    # Replace any missing or non-numeric values (like '-') with 0
+    df_goalie_stats.replace('-', 0, inplace=True)
+
+    # Calculate CPS for goalies: normalized stats with GAA, xG Against and Rebound Attempts Against inverted,
+    # and win percentage scaled down for goalies under the games played threshold
+    goalie_profile_cps = goalie_cps_matrix(df_goalie_stats, profiles)
+    df_goalie_stats['cps_goalie'] = goalie_profile_cps[default_profile]
+
+    # Add Position for goalies
+    df_goalie_stats['Position'] = 'G'
+    df_goalies_cps = df_goalie_stats[['Player', 'Position', 'cps_goalie']]
+
+    # --- Combine Skater and Goalie CPS Results ---
+    # Rename goalie CPS column for consistency, then combine skaters and goalies into one dataset
+    df_combined_cps = pd.concat([df_skaters_cps, df_goalies_cps.rename(columns={'cps_goalie': 'cps'})],
+                                ignore_index=True)
+
+    # CPS under every weight profile, one column per profile
+    df_profile_cps = pd.concat([
+        pd.concat([df_player_stats[['Player', 'Position']], skater_profile_cps], axis=1),
+        pd.concat([df_goalie_stats[['Player', 'Position']], goalie_profile_cps], axis=1),
+    ], ignore_index=True)
+    return df_skaters_cps, df_goalies_cps, df_combined_cps, df_profile_cps
+
+
+def main():
+    # Load the cleaned skater and goalie stats
+    df_player_stats = pd.read_csv(paths.skater_stats_path, float_precision='round_trip')
+    df_goalie_stats = pd.read_csv(paths.goalie_stats_wins_path, float_precision='round_trip')
+
+    df_skaters_cps, df_goalies_cps, df_combined_cps, df_profile_cps = integrate(df_player_stats, df_goalie_stats)
+
+    # Save skater, goalie, combined and per-profile CPS to CSV
+    df_skaters_cps.to_csv(paths.skater_cps_path, index=False)
+    df_goalies_cps.to_csv(paths.goalie_cps_path, index=False)
+    df_combined_cps.to_csv(paths.combined_cps_path, index=False)
+    df_profile_cps.to_csv(paths.profile_cps_path, index=False)
+
+    # Print the first few rows of the combined dataset
+    print(df_combined_cps.head())
+
+
+if __name__ == '__main__':
+    main()
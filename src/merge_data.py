@@ -1,69 +1,67 @@
 """
 Merge cps data with salary data
 
+Usage: python merge_data.py [date]   (contract snapshot to use: latest by default, or the latest on or before date)
+
 Author: Kevin Kang
 """
 
+import sys
+
 import pandas as pd
-import datetime
-
-# Get today's date in the desired format (YYYY-MM-DD)
-today = datetime.datetime.today().strftime('%Y-%m-%d')
-
-# Load salary data using today's date in the file path
-salary_file_path = f'../data/raw/all_player_contract_data_{today}.csv'
-salary_df = pd.read_csv(salary_file_path)
-
-# Load combined CPS data for both skaters and goalies
-combined_cps_df = pd.read_csv('../data/processed/cps/combined_player_goalie_cps.csv')
-
-# Rename the columns to match (standardize to 'player' for both)
-combined_cps_df.rename(columns={'Player': 'player'}, inplace=True)
-salary_df.rename(columns={'name': 'player'}, inplace=True)
-
-# Create a dictionary of name mappings (e.g., nicknames or slight variations)
-name_corrections = {
-    'Mitch Marner': 'Mitchell Marner',
-    'John (Jack) Roslovic': 'Jack Roslovic',
-    'Alexander Wennberg': 'Alex Wennberg',
-    'Cameron Atkinson': 'Cam Atkinson',
-    'Janis Moser': 'J.J. Moser',
-    'Patrick Maroon': 'Pat Maroon',
-    'Jani Hakanpää': 'Jani Hakanpää',
-    'Mathew Dumba': 'Matt Dumba',
-    'Matthew Grzelcyk': 'Matt Grzelcyk',
-    'Joshua Brown': 'Josh Brown',
-    'Gustav Lindstrom': 'Gustav Lindström',
-    'Joshua Mahura': 'Josh Mahura',
-    'Jesse Ylonen': 'Jesse Ylönen',
-    'Zachary Sanford': 'Zach Sanford',
-    'Jake Lucchini': 'Jacob Lucchini',
-    'Matt Benning': 'Matthew Benning',
-    'Maxime Lajoie': 'Max Lajoie',
-    'Maxime Comtois': 'Max Comtois',
-    'Alexander Petrovic': 'Alex Petrovic',
-    'Matthew Savoie': 'Matt Savoie'
-}
-
-# Replace names in the 'player' column of both DataFrames
-combined_cps_df['player'] = combined_cps_df['player'].replace(name_corrections)
-salary_df['player'] = salary_df['player'].replace(name_corrections)
-
-# Remove duplicate rows from each DataFrame before merging
-combined_cps_df = combined_cps_df.drop_duplicates(subset='player')  # Remove duplicates based on 'player'
-salary_df = salary_df.drop_duplicates(subset='player')  # Remove duplicates based on 'player'
-
-# Merge the two DataFrames on the 'player' column
-merged_df = pd.merge(combined_cps_df, salary_df, on='player')
-
-# Remove duplicates from the merged DataFrame if any exist
-merged_df = merged_df.drop_duplicates()
-
-# Display the first few rows of the merged dataset
-print(merged_df.head())
-
-# Save the merged DataFrame to a CSV file
-output_file_path = '../data/processed/merged_player_goalie_cps_and_salaries.csv'
-merged_df.to_csv(output_file_path, index=False)
+
+import instrument
+import paths
+from name_resolution import harmonize_names
+from snapshots import SnapshotStore
+
+
+# Combined CPS (skaters and goalies) joined with the contract data on player name
+def merge(combined_cps_df: pd.DataFrame, salary_df: pd.DataFrame) -> pd.DataFrame:
+    # Rename the columns to match (standardize to 'player' for both)
+    combined_cps_df = combined_cps_df.rename(columns={'Player': 'player'})
+    salary_df = salary_df.rename(columns={'name': 'player'})
+
+    # Match the salary player names to the CPS player names (nicknames, accents, known aliases).
+    # Unmatched players are reported here, since the inner merge below drops them.
+    salary_df, _ = harmonize_names(salary_df, 'player', combined_cps_df['player'], label='salaries')
+
+    # Remove duplicate rows from each DataFrame before merging
+    combined_cps_df = combined_cps_df.drop_duplicates(subset='player')  # Remove duplicates based on 'player'
+    salary_df = salary_df.drop_duplicates(subset='player')  # Remove duplicates based on 'player'
+
+    # Merge the two DataFrames on the 'player' column
+    merged_df = pd.merge(combined_cps_df, salary_df, on='player')
+    instrument.merge('cps + contracts', combined_cps_df, salary_df, merged_df)
+
+    # Players the inner merge dropped: CPS without a contract, and contracts without CPS
+    kept = set(merged_df['player'])
+    instrument.record('dropped_players', {
+        'without_contract': sorted(set(combined_cps_df['player']) - kept),
+        'without_cps': sorted(set(salary_df['player']) - kept),
+    })
+
+    # Remove duplicates from the merged DataFrame if any exist
+    return merged_df.drop_duplicates()
+
+
+def main(date=None):
+    # Load salary data from the contract snapshot for `date` (the latest scrape by default)
+    store = SnapshotStore()
+    print(f"Using contract snapshot {store.resolve(date)}")
+    salary_df = store.load(date)
+
+    # Load combined CPS data for both skaters and goalies
+    combined_cps_df = pd.read_csv(paths.combined_cps_path, float_precision='round_trip')
+
+    merged_df = merge(combined_cps_df, salary_df)
+
+    # Display the first few rows of the merged dataset
+    print(merged_df.head())
+
+    # Save the merged DataFrame to a CSV file
+    merged_df.to_csv(paths.merged_path, index=False)
 
 
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
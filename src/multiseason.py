@@ -0,0 +1,129 @@
+"""
+Multi-season roster optimization using the scraped contract terms
+
+Players are picked once, now, and stay on the roster for every season their current contract covers
+(contract_years_left, counting the current season). Each season then has its own salary cap and
+roster counts. A spot left open by an expiring contract is filled by a replacement-level player: a
+whole number of replacements per group and season, each at a fixed cap hit and CPS. Projected CPS
+declines with age past a peak, and later seasons are discounted.
+
+The model has one binary per player and one integer per (group, season); every per-season constraint
+is a sparse sum over the players still under contract, built in bulk with LpAffineExpression.
+
+Usage: python multiseason.py [seasons] [cap_growth]
+
+Author: Kevin Kang
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+from pulp import PULP_CBC_CMD, LpAffineExpression, LpConstraint, LpMaximize, LpProblem, LpVariable
+from pulp.constants import LpConstraintEQ, LpConstraintLE
+
+import paths
+from optimizer import pool_arrays, roster_sizes, salary_cap, solve_model
+
+seasons = 3
+cap_growth = 0.04  # Yearly salary cap increase
+discount = 0.9  # Weight of each later season relative to the one before
+peak_age = 27
+aging_decline = 0.04  # Share of projected CPS lost per year of age past the peak
+replacement_cap_hit = 775_000  # League minimum salary
+replacement_quantile = 0.25  # Replacement-level CPS: this quantile of the group's CPS
+
+
+# Age in whole years from Spotrac's "31-102d" format
+def parse_age(series):
+    return pd.to_numeric(series.astype(str).str.extract(r'^(\d+)')[0], errors='coerce')
+
+
+def season_caps(n_seasons, cap=salary_cap, growth=cap_growth):
+    return cap * (1 + growth) ** np.arange(n_seasons)
+
+
+# seasons x players: 1 while the player is under contract (always in season 0), else 0
+def active_matrix(years_left, n_seasons):
+    years_left = np.maximum(np.nan_to_num(np.asarray(years_left, dtype=float), nan=1.0), 1)
+    return np.arange(n_seasons)[:, None] < years_left[None, :]
+
+
+# seasons x players: projected CPS, declining by aging_decline per year past peak_age
+def projected_values(value, ages, n_seasons, peak=peak_age, decline=aging_decline):
+    value = np.asarray(value, dtype=float)
+    ages = np.nan_to_num(np.asarray(ages, dtype=float), nan=peak)
+    years_past_peak = np.maximum(ages[None, :] + np.arange(n_seasons)[:, None] - peak, 0)
+    years_past_peak -= np.maximum(ages - peak, 0)[None, :]  # Season 0 is the player's current CPS
+    return value[None, :] * (1 - decline) ** years_past_peak
+
+
+# {group: replacement-level CPS}
+def replacement_values(value, masks, sizes=roster_sizes, quantile=replacement_quantile):
+    return {group: float(np.quantile(value[masks[group]], quantile)) for group in sizes}
+
+
+# Build the model; returns the problem, the binary player variables and {(group, season): replacement variable}
+def build_multiseason_model(values, cost, masks, active, caps, sizes=roster_sizes, replacement=None,
+                            replacement_cost=replacement_cap_hit, season_discount=discount):
+    n_seasons, n_players = values.shape
+    cost = np.asarray(cost, dtype=float)
+    replacement = replacement or replacement_values(values[0], masks, sizes)
+    weights = season_discount ** np.arange(n_seasons)
+
+    problem = LpProblem("NHL_Multi_Season_Optimization", LpMaximize)
+    player_vars = [LpVariable(f"Player_{i}", cat="Binary") for i in range(n_players)]
+    # No replacements in the current season: the roster is built from the pool
+    replacement_vars = {(group, t): LpVariable(f"{group.capitalize()}_Replacements_{t}", lowBound=0, upBound=size,
+                                               cat="Integer")
+                        for group, size in sizes.items() for t in range(1, n_seasons)}
+
+    objective = (weights[:, None] * values * active).sum(axis=0)
+    problem.setObjective(LpAffineExpression(
+        list(zip(player_vars, objective.tolist()))
+        + [(var, weights[t] * replacement[group]) for (group, t), var in replacement_vars.items()]))
+
+    for t in range(n_seasons):
+        under_contract = np.flatnonzero(active[t])
+        cap_expr = LpAffineExpression([(player_vars[i], cost[i]) for i in under_contract.tolist()]
+                                      + [(var, replacement_cost) for (_, s), var in replacement_vars.items() if s == t])
+        problem.addConstraint(LpConstraint(cap_expr, LpConstraintLE, rhs=caps[t]), f"Salary_Cap_{t}")
+        for group, size in sizes.items():
+            members = np.flatnonzero(masks[group] & active[t])
+            expr = LpAffineExpression([(player_vars[i], 1) for i in members.tolist()])
+            if t > 0:
+                expr[replacement_vars[group, t]] = 1
+            problem.addConstraint(LpConstraint(expr, LpConstraintEQ, rhs=size), f"{group.capitalize()}_Limit_{t}")
+    return problem, player_vars, replacement_vars
+
+
+# Indices of the players to sign now and a seasons x groups DataFrame of replacement counts
+def solve_multiseason(merged_df, n_seasons=seasons, cap=salary_cap, growth=cap_growth, sizes=roster_sizes):
+    value, cost, masks = pool_arrays(merged_df)
+    active = active_matrix(merged_df['contract_years_left'].to_numpy(), n_seasons)
+    values = projected_values(value, parse_age(merged_df['age']).to_numpy(), n_seasons)
+
+    problem, player_vars, replacement_vars = build_multiseason_model(
+        values, cost, masks, active, season_caps(n_seasons, cap, growth), sizes)
+    selected = solve_model(problem, player_vars, PULP_CBC_CMD(msg=False))
+    replacements = pd.DataFrame(0, index=pd.RangeIndex(n_seasons, name='season'), columns=list(sizes))
+    for (group, t), var in replacement_vars.items():
+        replacements.loc[t, group] = int(round(var.varValue or 0))
+    return selected, replacements
+
+
+def main():
+    n_seasons = int(sys.argv[1]) if len(sys.argv) > 1 else seasons
+    growth = float(sys.argv[2]) if len(sys.argv) > 2 else cap_growth
+
+    merged_df = pd.read_csv(paths.merged_path, float_precision='round_trip')
+    selected, replacements = solve_multiseason(merged_df, n_seasons, growth=growth)
+
+    print(merged_df.iloc[selected][['player', 'Position', 'cps', 'cap_hit', 'contract_years_left', 'age']]
+          .reset_index(drop=True).to_string())
+    print("\nReplacement-level players needed per season:")
+    print(replacements)
+
+
+if __name__ == '__main__':
+    main()
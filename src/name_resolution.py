@@ -0,0 +1,213 @@
+"""
+Player name resolution shared by the cleaning and merging steps
+
+Names from different sources are matched against a list of canonical names in stages:
+
+1. Aliases: known variants that no normalization can reconcile (e.g. 'Janis Moser' -> 'J.J. Moser').
+2. Exact: a hash index on a normalized key (Unicode folded to ASCII, lowercased, punctuation dropped,
+   initials joined so 'J. J. Moser' and 'JJ Moser' agree). A nickname in parentheses is indexed
+   both ways: 'John (Jack) Roslovic' is found as 'John Roslovic' and as 'Jack Roslovic'.
+3. Nickname: the same key with common first-name short forms expanded ('Mitch' -> 'Mitchell').
+4. Fuzzy: a trigram inverted index proposes only the candidates that share trigrams with the name, so
+   matching 10k names against 10k is not all pairs; candidates are scored by trigram similarity
+   (Dice coefficient, on the nickname-expanded keys) and the best one is accepted above `min_confidence`.
+   A name reaching the threshold shares a minimum number of trigrams with the query, so candidates are
+   the names found in the query's trigram postings that often (count filtering); only they are scored.
+   Postings longer than `max_posting` are skipped whatever the index size, so the work per name does
+   not grow with it.
+
+Every result carries a confidence and the stage that matched, and names left unmatched are reported
+instead of silently dropping out of a later merge.
+
+Author: Kevin Kang
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+import instrument
+
+# Variants that normalization cannot reconcile: source spelling -> canonical spelling
+name_aliases = {
+    'Janis Moser': 'J.J. Moser',
+    'Jani Hakanp\x1a§\x1a§': 'Jani Hakanpää',  # Mis-encoded in the plus/minus export
+}
+
+# First-name short forms, expanded before the nickname lookup
+first_name_aliases = {
+    'alex': 'alexander',
+    'cam': 'cameron',
+    'charlie': 'charles',
+    'dan': 'daniel',
+    'danny': 'daniel',
+    'gabe': 'gabriel',
+    'jake': 'jacob',
+    'josh': 'joshua',
+    'mathew': 'matthew',
+    'matt': 'matthew',
+    'max': 'maxime',
+    'mike': 'michael',
+    'mikey': 'michael',
+    'mitch': 'mitchell',
+    'nick': 'nicholas',
+    'pat': 'patrick',
+    'sam': 'samuel',
+    'tom': 'thomas',
+    'will': 'william',
+    'zac': 'zachary',
+    'zach': 'zachary',
+}
+
+min_confidence = 0.8
+max_posting = 1000  # Trigrams found in more names than this are too common to block on
+
+
+def fold(name):
+    return unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+
+
+# Normalized lookup key: folded, lowercase, letters and spaces only, runs of initials joined
+def name_key(name):
+    words = re.sub(r"[^a-z ]+", ' ', fold(name).lower().replace('.', ' ').replace("'", '')).split()
+    joined = []
+    for word in words:
+        if len(word) == 1 and joined and joined[-1][1]:
+            joined[-1] = (joined[-1][0] + word, True)
+        else:
+            joined.append((word, len(word) == 1))
+    return ' '.join(word for word, _ in joined)
+
+
+# Keys for a name: without the parenthetical nickname, and with the nickname in place of the first name
+def name_keys(name):
+    match = re.match(r'^\s*(\S+)\s*\(([^)]*)\)\s*(.*)$', name)
+    if not match:
+        return [name_key(re.sub(r'\([^)]*\)', ' ', name))]
+    first, nickname, rest = match.groups()
+    return [name_key(f"{first} {rest}"), name_key(f"{nickname} {rest}")]
+
+
+def nickname_key(key, aliases=first_name_aliases):
+    first, _, rest = key.partition(' ')
+    return f"{aliases.get(first, first)} {rest}".strip()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def dice(a, b):
+    total = sum(a.values()) + sum(b.values())
+    return 2 * sum((a & b).values()) / total if total else 0.0
+
+
+# How many of the query's distinct trigrams a name scoring Dice >= threshold has.
+# Dice >= t needs at least t * |q| / (2 - t) trigrams in common, counted with repeats.
+def min_shared(grams, threshold):
+    size, distinct = sum(grams.values()), len(grams)
+    return max(1, math.ceil(threshold * size / (2 - threshold) - (size - distinct) - 1e-9))
+
+
+class NameIndex:
+    def __init__(self, names, aliases=name_aliases, nicknames=first_name_aliases):
+        self.names = list(dict.fromkeys(name for name in names if isinstance(name, str)))
+        self.aliases = aliases
+        self.nicknames = nicknames
+
+        self.exact = {}
+        self.nickname = {}
+        self.grams = []
+        postings = defaultdict(list)
+        for i, name in enumerate(self.names):
+            keys = name_keys(name)
+            for key in keys:
+                self.exact.setdefault(key, i)
+                self.nickname.setdefault(nickname_key(key, nicknames), i)
+            self.grams.append(trigrams(nickname_key(keys[0], nicknames)))
+            for gram in self.grams[i]:
+                postings[gram].append(i)
+        # Sorted name numbers per trigram, and the trigram count of every name
+        self.postings = {gram: np.array(posting) for gram, posting in postings.items()}
+        self.sizes = np.array([sum(grams.values()) for grams in self.grams])
+
+    # Canonical names that can reach Dice >= threshold with the query, in index order. They hold at least
+    # min_shared() of its trigrams: counted from the postings, plus the trigrams skipped for being in more
+    # than `max_posting` names, looked up for the remaining names only. Their size must also allow the threshold.
+    def candidates(self, grams, threshold=min_confidence):
+        postings = [self.postings[gram] for gram in grams if gram in self.postings]
+        rare = [posting for posting in postings if len(posting) <= max_posting]
+        common = [posting for posting in postings if len(posting) > max_posting]
+        if not rare:
+            return []
+        names, shared = np.unique(np.concatenate(rare), return_counts=True)
+        needed = min_shared(grams, threshold)
+        size = sum(grams.values())
+        keep = (shared + len(common) >= needed) & \
+            (2 * np.minimum(size, self.sizes[names]) >= threshold * (size + self.sizes[names]))
+        names, shared = names[keep], shared[keep]
+        for posting in common:
+            shared += posting[np.minimum(np.searchsorted(posting, names), len(posting) - 1)] == names
+        return names[shared >= needed].tolist()
+
+    # (canonical name or None, confidence, method)
+    def resolve(self, name, threshold=min_confidence):
+        if not isinstance(name, str):
+            return None, 0.0, 'unmatched'
+        if name in self.aliases and self.aliases[name] in self.names:
+            return self.aliases[name], 1.0, 'alias'
+
+        keys = name_keys(name)
+        for key in keys:
+            if key in self.exact:
+                return self.names[self.exact[key]], 1.0, 'exact'
+        for key in keys:
+            if nickname_key(key, self.nicknames) in self.nickname:
+                return self.names[self.nickname[nickname_key(key, self.nicknames)]], 0.95, 'nickname'
+
+        grams = trigrams(nickname_key(keys[0], self.nicknames))
+        best, best_score = None, 0.0
+        for i in self.candidates(grams, threshold):
+            score = dice(grams, self.grams[i])
+            if score > best_score:
+                best, best_score = i, score
+        if best is not None and best_score >= threshold:
+            return self.names[best], round(best_score, 4), 'fuzzy'
+        return None, round(best_score, 4), 'unmatched'
+
+    # One row per distinct name: name, match, confidence, method
+    def resolve_many(self, names, threshold=min_confidence):
+        distinct = pd.unique(pd.Series(names, dtype=object).dropna())
+        rows = [(name, *self.resolve(name, threshold)) for name in distinct]
+        return pd.DataFrame(rows, columns=['name', 'match', 'confidence', 'method'])
+
+
+# Replace `column` with the canonical names it resolves to; unmatched names are kept as they are.
+# Returns the updated DataFrame and the resolution table.
+def harmonize_names(df, column, canonical_names, threshold=min_confidence, label=None):
+    resolution = NameIndex(canonical_names).resolve_many(df[column], threshold)
+    matched = resolution[resolution['match'].notna() & (resolution['match'] != resolution['name'])]
+    df = df.copy()
+    # A dict lookup per row: Series.replace with a dict makes one pass over the column per entry
+    renames = dict(zip(matched['name'], matched['match']))
+    df[column] = df[column].map(lambda name: renames.get(name, name))
+    report_resolution(resolution, label or column)
+    instrument.record(f"name_resolution ({label or column})", resolution['method'].value_counts().to_dict())
+    instrument.record(f"unmatched names ({label or column})",
+                      resolution.loc[resolution['method'] == 'unmatched', 'name'].tolist())
+    return df, resolution
+
+
+def report_resolution(resolution, label):
+    counts = resolution['method'].value_counts()
+    print(f"Name resolution ({label}): " + ', '.join(f"{method} {count}" for method, count in counts.items()))
+    for row in resolution[resolution['method'] == 'fuzzy'].itertuples():
+        print(f"  fuzzy: {row.name!r} -> {row.match!r} ({row.confidence:.2f})")
+    unmatched = resolution.loc[resolution['method'] == 'unmatched', 'name']
+    if len(unmatched):
+        print(f"  unmatched ({len(unmatched)}): " + ', '.join(unmatched.tolist()))
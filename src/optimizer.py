@@ -0,0 +1,151 @@
+"""
+Roster optimization over NumPy arrays
+
+The model takes player value (CPS), cost (cap hit) and one boolean mask per roster group, and builds
+the objective and constraints in bulk with LpAffineExpression rather than one DataFrame lookup per
+player per constraint. Results are read back into an array of selected indices.
+
+Author: Kevin Kang
+"""
+
+import numpy as np
+import pandas as pd
+from pulp import PULP_CBC_CMD, LpAffineExpression, LpConstraint, LpMaximize, LpProblem, LpStatus, LpVariable
+from pulp.constants import LpConstraintEQ, LpConstraintLE
+
+# Roster structure: which positions make up each group and how many of each group to pick
+roster_groups = {'forwards': ['C', 'L', 'R'], 'defensemen': ['D'], 'goalies': ['G']}
+roster_sizes = {'forwards': 12, 'defensemen': 6, 'goalies': 2}
+salary_cap = 83.5e6  # Salary cap in dollars
+
+
+class InfeasibleRosterError(Exception):
+    pass
+
+
+# {group: boolean mask over players} from an array of position strings
+def group_masks(positions, groups=roster_groups):
+    positions = np.asarray(positions)
+    return {group: np.isin(positions, group_positions) for group, group_positions in groups.items()}
+
+
+# Value (cps), cost (cap_hit) and group masks from the merged CPS + salary data; cap_hit may be formatted like "$1,000,000"
+def pool_arrays(merged_df):
+    cap_hit = pd.to_numeric(merged_df['cap_hit'].replace({r'\$': '', ',': ''}, regex=True), errors='coerce')
+    return (merged_df['cps'].fillna(0).to_numpy(dtype=float), cap_hit.fillna(0).to_numpy(dtype=float),
+            group_masks(merged_df['Position'].to_numpy()))
+
+
+# Build the PuLP model; returns the problem and the list of binary player variables
+def build_model(value, cost, masks, cap=salary_cap, sizes=roster_sizes):
+    value = np.asarray(value, dtype=float)
+    cost = np.asarray(cost, dtype=float)
+
+    problem = LpProblem("NHL_Salary_Cap_Optimization", LpMaximize)
+    player_vars = [LpVariable(f"Player_{i}", cat="Binary") for i in range(len(value))]
+
+    problem.setObjective(LpAffineExpression(zip(player_vars, value.tolist())))
+    problem.addConstraint(LpConstraint(LpAffineExpression(zip(player_vars, cost.tolist())),
+                                       LpConstraintLE, rhs=cap), "Salary_Cap")
+    for group, size in sizes.items():
+        members = np.flatnonzero(masks[group])
+        expr = LpAffineExpression([(player_vars[i], 1) for i in members.tolist()])
+        problem.addConstraint(LpConstraint(expr, LpConstraintEQ, rhs=size), f"{group.capitalize()}_Limit")
+    return problem, player_vars
+
+
+def solve_model(problem, player_vars, solver=None):
+    problem.solve(solver or PULP_CBC_CMD(msg=False))
+    status = LpStatus[problem.status]
+    if status != 'Optimal':
+        raise InfeasibleRosterError(f"No optimal roster found (solver status: {status})")
+    chosen = np.fromiter((var.varValue or 0 for var in player_vars), dtype=float, count=len(player_vars))
+    return np.flatnonzero(chosen > 0.5)
+
+
+# Indices of the players in the optimal roster
+def solve_roster(value, cost, masks, cap=salary_cap, sizes=roster_sizes):
+    problem, player_vars = build_model(value, cost, masks, cap, sizes)
+    return solve_model(problem, player_vars)
+
+
+# A model built once and re-solved many times. What-if changes (cap, locked/excluded players, extra limits)
+# only touch the part of the model they affect, and each solve is warm-started from the previous roster.
+class RosterModel:
+    def __init__(self, value, cost, masks, cap=salary_cap, sizes=roster_sizes):
+        self.problem, self.player_vars = build_model(value, cost, masks, cap, sizes)
+        self.cap = cap
+        self.selected = None
+        self.locked, self.excluded = set(), set()
+
+    def set_cap(self, cap):
+        self.problem.constraints['Salary_Cap'].changeRHS(cap)
+        self.cap = cap
+
+    # Player counts per roster group, e.g. {'forwards': 13}; groups left out keep their count
+    def set_sizes(self, sizes):
+        for group, size in sizes.items():
+            self.problem.constraints[f"{group.capitalize()}_Limit"].changeRHS(size)
+
+    # New objective values (e.g. CPS under another weight profile)
+    def set_value(self, value):
+        self.problem.setObjective(LpAffineExpression(zip(self.player_vars, np.asarray(value, dtype=float).tolist())))
+
+    # Variables still hold the previous solution, which is what CBC's warm start reads
+    def solve(self, warm_start=True):
+        conflicts = self.locked & self.excluded
+        if conflicts:
+            raise InfeasibleRosterError(f"Players both locked and excluded (rows {sorted(conflicts)})")
+        warm_start = warm_start and self.selected is not None
+        self.selected = solve_model(self.problem, self.player_vars, PULP_CBC_CMD(msg=False, warmStart=warm_start))
+        return self.selected
+
+    # Force players into every roster
+    def lock(self, indices):
+        for i in np.atleast_1d(indices).tolist():
+            self.player_vars[i].lowBound = 1
+            self.locked.add(i)
+
+    # Keep players out of every roster
+    def exclude(self, indices):
+        for i in np.atleast_1d(indices).tolist():
+            self.player_vars[i].upBound = 0
+            self.excluded.add(i)
+
+    # Undo lock/exclude
+    def release(self, indices):
+        for i in np.atleast_1d(indices).tolist():
+            self.player_vars[i].lowBound = 0
+            self.player_vars[i].upBound = 1
+            self.locked.discard(i)
+            self.excluded.discard(i)
+
+    # At most `max_count` selected players from `mask`, e.g. one team
+    def add_limit(self, name, mask, max_count):
+        expr = LpAffineExpression([(self.player_vars[i], 1) for i in np.flatnonzero(mask).tolist()])
+        self.problem.addConstraint(LpConstraint(expr, LpConstraintLE, rhs=max_count), name)
+
+    def remove_constraint(self, name):
+        del self.problem.constraints[name]
+
+    # The k best distinct rosters, best first. After each solve a no-good cut forbids rosters sharing more
+    # than (roster size - min_difference) players with it; the cuts are removed again before returning.
+    # Raises InfeasibleRosterError when there is no roster at all.
+    def top_k(self, k, min_difference=1):
+        rosters, cuts = [], []
+        try:
+            for n in range(k):
+                try:
+                    selected = self.solve()
+                except InfeasibleRosterError:
+                    if not rosters:
+                        raise
+                    break
+                rosters.append(selected)
+                cut = f"No_Good_{n}"
+                self.add_limit(cut, np.isin(np.arange(len(self.player_vars)), selected), len(selected) - min_difference)
+                cuts.append(cut)
+        finally:
+            for cut in cuts:
+                self.remove_constraint(cut)
+        return rosters
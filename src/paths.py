@@ -0,0 +1,66 @@
+"""
+Project file locations, resolved from this file so the scripts work from any working directory
+
+Author: Kevin Kang
+"""
+
+import os
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+data_dir = os.path.join(root, 'data')
+raw_dir = os.path.join(data_dir, 'raw')
+cleaned_dir = os.path.join(data_dir, 'cleaned')
+processed_dir = os.path.join(data_dir, 'processed')
+cps_dir = os.path.join(processed_dir, 'cps')
+cache_dir = os.path.join(data_dir, 'cache')
+synthetic_dir = os.path.join(data_dir, 'synthetic')
+snapshot_dir = os.path.join(data_dir, 'snapshots', 'contracts')
+result_dir = os.path.join(root, 'result')
+
+# Raw inputs
+player_stats_path = os.path.join(raw_dir, 'player_stats_23_24.csv')
+plus_minus_path = os.path.join(raw_dir, 'players_plus_minus.csv')
+goalie_stats_path = os.path.join(raw_dir, 'goalie_stats_23_24.csv')
+goalie_wins_path = os.path.join(raw_dir, 'goalie_wins_losses.csv')
+
+# Intermediate and final outputs
+skater_stats_path = os.path.join(cleaned_dir, 'merged_player_stats_with_plus_minus.csv')
+goalie_stats_wins_path = os.path.join(cleaned_dir, 'merged_goalie_stats_with_wins.csv')
+skater_cps_path = os.path.join(cps_dir, 'player_cps.csv')
+goalie_cps_path = os.path.join(cps_dir, 'goalie_cps.csv')
+combined_cps_path = os.path.join(cps_dir, 'combined_player_goalie_cps.csv')
+profile_cps_path = os.path.join(cps_dir, 'profile_cps.csv')
+merged_path = os.path.join(processed_dir, 'merged_player_goalie_cps_and_salaries.csv')
+roster_path = os.path.join(result_dir, 'optimized_team.csv')
+cap_frontier_path = os.path.join(result_dir, 'cap_frontier.csv')
+robustness_path = os.path.join(result_dir, 'roster_robustness.csv')
+
+# The pipeline's tables (see pipeline.py) and their CSV files; Parquet/Feather copies sit next to them (storage.py)
+table_paths = {
+    'raw_player_stats': player_stats_path,
+    'raw_plus_minus': plus_minus_path,
+    'raw_goalie_stats': goalie_stats_path,
+    'raw_goalie_wins': goalie_wins_path,
+    'skater_stats': skater_stats_path,
+    'goalie_stats': goalie_stats_wins_path,
+    'skater_cps': skater_cps_path,
+    'goalie_cps': goalie_cps_path,
+    'combined_cps': combined_cps_path,
+    'profile_cps': profile_cps_path,
+    'merged': merged_path,
+    'roster': roster_path,
+}
+
+# Run reports and stage profiles (pipeline.py --report / --profile)
+report_dir = os.path.join(result_dir, 'reports')
+run_report_path = os.path.join(report_dir, 'run_report.json')
+profile_dir = os.path.join(report_dir, 'profiles')
+
+# End-to-end benchmarks (bench_pipeline.py): the stored baseline and every run so far
+benchmark_dir = os.path.join(result_dir, 'benchmarks')
+benchmark_baseline_path = os.path.join(benchmark_dir, 'baseline.json')
+benchmark_history_path = os.path.join(benchmark_dir, 'history.jsonl')
+
+
+def contract_path(date, output_dir=raw_dir):
+    return os.path.join(output_dir, f'all_player_contract_data_{date}.csv')
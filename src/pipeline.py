@@ -0,0 +1,168 @@
+"""
+Run the whole pipeline (get, clean, integrate, merge, analyze) in one process
+
+Each stage is a function from named input tables to named output tables. The runner orders the
+stages by those names (a stage runs after the stages producing its inputs), hands DataFrames from one
+stage to the next in memory, and only reads a CSV for an input that no stage in the run produces (the
+raw stats exports, or the latest contract snapshot when 'get' is skipped, or the one pinned with
+--contracts-date). The final roster is always written to result/optimized_team.csv; writing the
+intermediate CSVs is optional.
+
+Tables can be stored as Parquet or Feather instead of CSV (--format, see storage.py). Each stage
+declares the columns it needs from a table it loads, and only those columns are read.
+
+Every stage is measured (see instrument.py): --report writes the run report as JSON, and --profile
+profiles each stage with cProfile or pyinstrument.
+
+Usage: python pipeline.py [--scrape] [--write] [--format parquet] [--contracts-date DATE] [--stages clean ...]
+                          [--report [PATH]] [--profile cprofile|pyinstrument]
+
+Author: Kevin Kang
+"""
+
+import argparse
+import graphlib
+import os
+import time
+from collections import namedtuple
+
+import analyze_data
+import clean_data
+import cps
+import get_data
+import integrate_data
+import merge_data
+import paths
+from instrument import RunReport, profilers
+from snapshots import SnapshotStore
+from storage import apply_schema, format_path, read_table, schemas, write_table
+
+# `columns`: {input table: the only columns the stage reads from it}, used when the table is loaded from disk
+Stage = namedtuple('Stage', ['function', 'inputs', 'outputs', 'columns'], defaults=[{}])
+
+# Every input is either another stage's output or a source file below; stage_order() works out the run order
+stages = {
+    'get': Stage(get_data.scrape_contracts, [], ['contracts']),
+    'clean': Stage(clean_data.clean, ['raw_player_stats', 'raw_plus_minus', 'raw_goalie_stats', 'raw_goalie_wins'],
+                   ['skater_stats', 'goalie_stats'],
+                   {'raw_plus_minus': ['Player', '+/-'], 'raw_goalie_wins': ['Player', 'W']}),
+    'integrate': Stage(integrate_data.integrate, ['skater_stats', 'goalie_stats'],
+                       ['skater_cps', 'goalie_cps', 'combined_cps', 'profile_cps'],
+                       {'skater_stats': ['Player', 'Position'] + cps.skater_input_columns,
+                        'goalie_stats': ['Player'] + cps.goalie_input_columns}),
+    'merge': Stage(merge_data.merge, ['combined_cps', 'contracts'], ['merged']),
+    'analyze': Stage(analyze_data.analyze, ['merged'], ['roster'], {'merged': ['player', 'Position', 'cps', 'cap_hit']}),
+}
+
+# Tables are read from paths.table_paths when no stage in the run produces them, and written there with --write.
+# Contracts come from the snapshot store instead.
+table_paths = paths.table_paths
+
+# Final outputs, written as CSV whatever the storage format, for people and the other scripts to read
+result_tables = {'roster'}
+
+
+# Stage names in dependency order: every stage after the stages producing its inputs.
+# Stages with no dependency between them keep the order of `stages`.
+def stage_order(stages=stages):
+    producers = {table: name for name, stage in stages.items() for table in stage.outputs}
+    sorter = graphlib.TopologicalSorter()
+    for name, stage in stages.items():
+        sorter.add(name, *(producers[table] for table in stage.inputs if table in producers))
+    sorter.prepare()
+    order = []
+    while sorter.is_active():
+        ready = sorted(sorter.get_ready(), key=list(stages).index)
+        order.extend(ready)
+        sorter.done(*ready)
+    return order
+
+
+# Load a table no stage in the run produces. With a columnar `fmt` its Parquet/Feather file is read if there is
+# one and it is not older than the CSV (a stage run that wrote only the CSV leaves the columnar copy stale);
+# otherwise the CSV is read and coerced to the table's schema so both give the same types.
+def load_table(name, columns=None, fmt='csv', contracts_date=None):
+    if name == 'contracts':
+        store = SnapshotStore()
+        print(f"Using contract snapshot {store.resolve(contracts_date)}")
+        df = store.load(contracts_date)
+        df = df[columns] if columns else df
+        return df if fmt == 'csv' else apply_schema(df, schemas[name])
+
+    path = table_paths[name]
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No stage produces '{name}' in this run and {path} does not exist")
+    if fmt == 'csv':
+        return read_table(path, columns)
+    columnar = format_path(path, fmt)
+    if os.path.exists(columnar):
+        if os.path.getmtime(columnar) >= os.path.getmtime(path):
+            return read_table(columnar, columns)
+        print(f"{columnar} is older than {path}; reading the CSV")
+    return read_table(path, columns, schemas.get(name))
+
+
+# Run `selected` stages (all but 'get' by default) and return {table name: DataFrame} for every table used.
+# `write` is True for every output, or a collection of table names to write; `fmt` is the storage format
+# (tables in `result_tables` are written as CSV).
+# `contracts_date` pins the contract snapshot used when 'get' is not run. Each stage is measured in `report`
+# (a RunReport; loading and writing tables count as part of the stage).
+def run(selected=None, write=False, fmt='csv', contracts_date=None, report=None):
+    selected = [name for name in stage_order() if name in (selected or [name for name in stages if name != 'get'])]
+    report = report or RunReport()
+    tables = {}
+    for name in selected:
+        stage = stages[name]
+        with report.stage(name) as entry:
+            for table in stage.inputs:
+                if table not in tables:
+                    tables[table] = load_table(table, stage.columns.get(table), fmt, contracts_date)
+            entry['rows_in'] = {table: len(tables[table]) for table in stage.inputs}
+
+            start = time.perf_counter()
+            outputs = stage.function(*(tables[table] for table in stage.inputs))
+            outputs = outputs if isinstance(outputs, tuple) else (outputs,)
+            tables.update(zip(stage.outputs, outputs))
+            entry['rows_out'] = {table: len(df) for table, df in zip(stage.outputs, outputs)}
+            print(f"[{name}] {time.perf_counter() - start:.3f} s")
+
+            for table, df in zip(stage.outputs, outputs):
+                if table == 'contracts':
+                    SnapshotStore().save(df)  # A scrape is always kept
+                elif write is True or (write and table in write):
+                    path = table_paths[table] if table in result_tables else format_path(table_paths[table], fmt)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    write_table(df, path, schemas.get(table))
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--stages', nargs='+', choices=list(stages), help='stages to run (default: all but get)')
+    parser.add_argument('--scrape', action='store_true', help='include the get stage (scrape Spotrac)')
+    parser.add_argument('--write', nargs='*', metavar='TABLE',
+                        help='also write intermediate tables to their usual files (all of them if no names are given)')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='csv', help='storage format')
+    parser.add_argument('--contracts-date', help='contract snapshot to use: the latest on or before this date')
+    parser.add_argument('--report', nargs='?', const=paths.run_report_path, metavar='PATH',
+                        help=f'write the JSON run report (default path: {paths.run_report_path})')
+    parser.add_argument('--profile', choices=profilers, help=f'profile each stage into {paths.profile_dir}')
+    args = parser.parse_args()
+
+    selected = args.stages or [name for name in stages if args.scrape or name != 'get']
+    write = True if args.write == [] else set(args.write or []) | result_tables
+
+    report = RunReport(args.profile)
+    start = time.perf_counter()
+    tables = run(selected, write, args.format, args.contracts_date, report)
+    print(f"Pipeline finished in {time.perf_counter() - start:.3f} s")
+    print(report.summary())
+    if args.report:
+        report.write(args.report)
+        print(f"Run report written to {args.report}")
+    if 'roster' in tables:
+        print(tables['roster'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Compact player pool: the columns scoring and the optimizer use, as plain typed arrays
+
+The merged table carries every contract field as pandas columns, most of them strings the optimizer
+never reads (url, birthday, college, drafted...). A PlayerPool keeps only what it needs, one array
+per field:
+
+    cps          float32   CPS (0 where missing, as the optimizer treats it)
+    cap_hit      int32     cap hit in dollars (0 where missing)
+    years_left   int32     contract years left (-1 where missing)
+    position     uint8     index into cps.positions (255 for anything else)
+    player_id    int32     index into the player name table
+    team_id      int32     index into the team name table (-1 where missing)
+
+Player and team names are interned: each name is stored once, and the rows hold ids. The names sit
+in a side table with the two merged fields the arrays cannot stand in for: the float64 CPS as
+published and status_after_contract (for trades.py), one row per pool row. The other merged columns
+are dropped. The side table is only read when a roster is rendered or players are looked up by name
+or status. Rendered rosters follow the roster schema in storage.py (CPS float64, Cap Hit int64), so
+the float32 CPS never reaches the output. A saved pool is one .npy file per column, memory-mapped on
+load, plus the side table (metadata.csv, names.json). arrays() gives the optimizer value and cost
+without a DataFrame in between; build_model still converts them to float for PuLP.
+
+Usage: python player_pool.py [scale]   (memory of the merged table vs the pool, at `scale` times the rows)
+
+Author: Kevin Kang
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import paths
+from cps import positions
+from optimizer import roster_groups
+
+column_dtypes = {
+    'cps': np.float32,
+    'cap_hit': np.int32,
+    'years_left': np.int32,
+    'position': np.uint8,
+    'player_id': np.int32,
+    'team_id': np.int32,
+}
+unknown_position = 255
+# Position label per position code
+position_labels = np.array(positions + ['?'] * (unknown_position + 1 - len(positions)))
+# Merged columns kept in the arrays, and the ones kept in the side table (row i is pool row i)
+array_sources = ['player', 'Position', 'cps', 'cap_hit', 'contract_years_left', 'team_name']
+side_columns = ['cps', 'status_after_contract']
+
+
+def position_codes(position_series):
+    codes = pd.Categorical(position_series, categories=positions).codes
+    return np.where(codes < 0, unknown_position, codes).astype(np.uint8)
+
+
+def money(series):
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series.replace({r'\$': '', ',': ''}, regex=True), errors='coerce')
+    return series
+
+
+class PlayerPool:
+    """Struct of arrays for a player pool; string fields are in a side table loaded on first use"""
+
+    def __init__(self, arrays, metadata=None, names=None, side_dir=None):
+        for column, dtype in column_dtypes.items():
+            setattr(self, column, np.asarray(arrays[column], dtype=dtype))
+        self._metadata = metadata
+        self._names = names
+        self.side_dir = side_dir
+
+    # Pool of the merged table's rows; without team_name or contract_years_left, team_id and years_left are -1
+    @classmethod
+    def from_frame(cls, merged_df):
+        merged_df = merged_df.reset_index(drop=True)
+        missing = pd.Series(np.nan, index=merged_df.index)
+        player_id, players = pd.factorize(merged_df['player'])
+        team_id, teams = pd.factorize(merged_df['team_name'] if 'team_name' in merged_df else missing)
+        years_left = pd.to_numeric(merged_df.get('contract_years_left', missing), errors='coerce')
+        arrays = {
+            'cps': pd.to_numeric(merged_df['cps'], errors='coerce').fillna(0).to_numpy(dtype=np.float32),
+            'cap_hit': money(merged_df['cap_hit']).fillna(0).round().to_numpy(dtype=np.int32),
+            'years_left': years_left.fillna(-1).to_numpy(dtype=np.int32),
+            'position': position_codes(merged_df['Position']),
+            'player_id': player_id,
+            'team_id': team_id,
+        }
+        metadata = pd.DataFrame({
+            'cps': pd.to_numeric(merged_df['cps'], errors='coerce').fillna(0).to_numpy(dtype=np.float64),
+            'status_after_contract': (merged_df['status_after_contract'] if 'status_after_contract' in merged_df
+                                      else missing).astype('category'),
+        })
+        return cls(arrays, metadata, {'players': list(players), 'teams': list(teams)})
+
+    def __len__(self):
+        return len(self.cps)
+
+    # Bytes held by the arrays (the side table is not counted)
+    def nbytes(self):
+        return sum(getattr(self, column).nbytes for column in column_dtypes)
+
+    # Bytes held by the side table and the name lists
+    def side_nbytes(self):
+        names = sum(sys.getsizeof(name) for names in self.names.values() for name in names)
+        return self.metadata.memory_usage(deep=True).sum() + names
+
+    # {group: boolean mask} from the position codes
+    def masks(self, groups=roster_groups):
+        return {group: np.isin(self.position, [positions.index(p) for p in group_positions])
+                for group, group_positions in groups.items()}
+
+    # Value, cost and group masks for the optimizer, like optimizer.pool_arrays
+    def arrays(self):
+        return self.cps, self.cap_hit, self.masks()
+
+    @property
+    def names(self):
+        if self._names is None:
+            with open(os.path.join(self.side_dir, 'names.json'), encoding='utf-8') as f:
+                self._names = json.load(f)
+        return self._names
+
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            self._metadata = pd.read_csv(os.path.join(self.side_dir, 'metadata.csv'), float_precision='round_trip',
+                                         dtype={'status_after_contract': 'category'})
+        return self._metadata
+
+    @property
+    def metadata_loaded(self):
+        return self._metadata is not None
+
+    # Row indices of the players called `names`
+    def indices(self, names):
+        ids = {name: i for i, name in enumerate(self.names['players'])}
+        unknown = [name for name in names if name not in ids]
+        if unknown:
+            raise ValueError(f"Unknown players: {unknown}")
+        return np.flatnonzero(np.isin(self.player_id, [ids[name] for name in names]))
+
+    # The rows `selected` as a roster table (Player, Position, CPS, Cap Hit)
+    def render(self, selected):
+        selected = np.asarray(selected, dtype=np.int64)
+        players = np.array(self.names['players'], dtype=object)
+        return pd.DataFrame({
+            'Player': players[self.player_id[selected]],
+            'Position': position_labels[self.position[selected]],
+            'CPS': self.metadata['cps'].to_numpy(dtype=np.float64)[selected],
+            'Cap Hit': self.cap_hit[selected].astype(np.int64),
+        })
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for column in column_dtypes:
+            np.save(os.path.join(directory, f'{column}.npy'), getattr(self, column))
+        self.metadata.to_csv(os.path.join(directory, 'metadata.csv'), index=False)
+        with open(os.path.join(directory, 'names.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.names, f, ensure_ascii=False)
+
+    # Memory-map the arrays of a saved pool (read-only, nothing is copied); the side table is read when first used
+    @classmethod
+    def load(cls, directory, mmap=True):
+        arrays = {column: np.load(os.path.join(directory, f'{column}.npy'), mmap_mode='r' if mmap else None)
+                  for column in column_dtypes}
+        return cls(arrays, side_dir=directory)
+
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    merged_df = pd.read_csv(paths.merged_path, float_precision='round_trip')
+    merged_df = pd.concat([merged_df] * scale, ignore_index=True)
+
+    pool = PlayerPool.from_frame(merged_df)
+    frame_mb = merged_df.memory_usage(deep=True).sum() / 1e6
+    needed_mb = merged_df[array_sources].memory_usage(deep=True).sum() / 1e6
+    print(f"{len(pool)} players")
+    print(f"merged table:            {frame_mb:9.2f} MB")
+    print(f"  its optimizer columns: {needed_mb:9.2f} MB")
+    print(f"compact pool arrays:     {pool.nbytes() / 1e6:9.2f} MB")
+    print(f"  its side table:        {pool.side_nbytes() / 1e6:9.2f} MB")
+
+    with tempfile.TemporaryDirectory() as directory:
+        pool.save(directory)
+        start = time.perf_counter()
+        loaded = PlayerPool.load(directory)
+        value, cost, masks = loaded.arrays()
+        elapsed = time.perf_counter() - start
+        print(f"load + arrays from disk (memory-mapped): {elapsed * 1e3:.1f} ms, "
+              f"side table loaded: {loaded.metadata_loaded}")
+
+
+if __name__ == '__main__':
+    main()
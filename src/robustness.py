@@ -0,0 +1,200 @@
+"""
+Monte Carlo robustness of the optimal roster under CPS uncertainty
+
+CPS is a point estimate, so this re-solves the roster for thousands of perturbed versions of it:
+
+- 'metrics': Gaussian noise (sd `sigma`) on every normalized metric before the weights are applied
+- 'weights': every CPS weight scaled by (1 + noise), floored at 0
+
+It reports how often each player is picked, and bands on total CPS: for the best roster of each draw,
+and for the published roster re-scored under the same draws.
+
+The draws run on a process pool. The player arrays (normalized metrics, positions, cap hits, weights)
+are placed in shared memory once, and every worker maps them read-only. A task is only a range of
+draw numbers, and each draw's noise comes from its own seed, so results do not depend on how the draws
+are split. Within a task each solve is warm-started from the previous draw's roster: the incumbent for
+the exact solver, or CBC's warm start for a per-process RosterModel.
+
+Usage: python robustness.py [--draws N] [--mode metrics|weights] [--sigma S] [--workers W] [--solver exact|cbc]
+
+Author: Kevin Kang
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import cps
+import paths
+from exact_roster import solve_roster_exact
+from optimizer import RosterModel, group_masks, pool_arrays, roster_sizes, salary_cap
+
+modes = ('metrics', 'weights')
+default_sigma = {'metrics': 0.05, 'weights': 0.2}
+n_draws = 1000
+band = 0.9  # Central share of the draws inside the reported bands
+chunks_per_worker = 4
+
+# The shared arrays as seen by a worker process, set by attach()
+shared = {}
+
+
+# Normalized metrics (all of cps.metrics; skaters have no goalie metrics and the reverse) and position
+# index for every merged player, from the cleaned stats as integrate_data scores them
+def pool_metrics(merged_df, skater_stats, goalie_stats):
+    skaters = skater_stats.copy()
+    skaters['Position'] = cps.select_second_position(skaters['Position'])
+    skaters = skaters.replace('-', 0)
+    goalies = goalie_stats.replace('-', 0)
+
+    values = np.full((len(skaters) + len(goalies), len(cps.metrics)), np.nan)
+    values[:len(skaters), :len(cps.skater_metrics)] = cps.skater_metric_values(skaters)
+    values[len(skaters):, len(cps.skater_metrics):] = cps.goalie_metric_values(goalies)
+
+    # Merged rows come from the first combined CPS row with the player's name (merge_data drops later ones)
+    names = pd.concat([skaters['Player'], goalies['Player']], ignore_index=True)
+    first_row = pd.Series(np.arange(len(names)), index=names).groupby(level=0).first()
+    rows = merged_df['player'].map(first_row).to_numpy()
+    if np.isnan(rows.astype(float)).any():
+        raise ValueError("Merged players missing from the cleaned stats")
+    return values[rows.astype(np.int64)], cps.position_index(merged_df['Position'])
+
+
+# Copy `arrays` ({name: array}) into shared memory; returns the blocks (kept open by the caller) and their specs
+def share(arrays):
+    blocks, specs = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+# Worker initializer: map the shared arrays read-only
+def attach(specs):
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        array = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        shared[name] = array
+        shared.setdefault('blocks', []).append(block)  # Keep the mapping alive
+    # An unknown position (-1) picks the trailing '', which is in no group
+    shared['masks'] = group_masks(np.array(cps.positions + [''])[shared['pos_index']])
+
+
+# CPS of every player under draw `draw`
+def draw_values(draw, mode, sigma, seed):
+    rng = np.random.default_rng([seed, draw])
+    values, weights = shared['values'], shared['weights']
+    if mode == 'metrics':
+        values = values + rng.normal(0, sigma, size=values.shape)
+    else:
+        weights = np.maximum(weights * (1 + rng.normal(0, sigma, size=weights.shape)), 0)
+    return np.nan_to_num(cps.score(values, shared['pos_index'], weights))
+
+
+# Solve draws start..stop, each warm-started from the roster before it. Returns the draws' rosters (rows of
+# player indices), their total CPS and the published roster's total CPS under the same draws.
+def solve_draws(start, stop, mode, sigma, seed, cap, solver):
+    cost, masks, base = shared['cost'], shared['masks'], shared['base']
+    rosters = np.empty((stop - start, len(base)), dtype=np.int64)
+    totals = np.empty(stop - start)
+    base_totals = np.empty(stop - start)
+    model = shared.get('model')
+    previous = base
+    for n, draw in enumerate(range(start, stop)):
+        value = draw_values(draw, mode, sigma, seed)
+        if solver == 'cbc':
+            if model is None:
+                model = shared['model'] = RosterModel(value, cost, masks, cap)
+            model.set_value(value)
+            selected = model.solve()
+        else:
+            selected = solve_roster_exact(value, cost, masks, cap, incumbent=previous)
+        rosters[n], totals[n], base_totals[n] = selected, value[selected].sum(), value[base].sum()
+        previous = selected
+    return start, rosters, totals, base_totals
+
+
+# Run `draws` draws on `workers` processes; returns (rosters, totals, base totals) in draw order
+def simulate(values, pos_index, cost, weights, base, draws=n_draws, mode='metrics', sigma=None, seed=0,
+             cap=salary_cap, solver='exact', workers=None):
+    sigma = default_sigma[mode] if sigma is None else sigma
+    workers = workers or os.cpu_count()
+    blocks, specs = share({'values': values, 'pos_index': pos_index, 'cost': cost, 'weights': weights, 'base': base})
+    try:
+        bounds = np.linspace(0, draws, min(draws, workers * chunks_per_worker) + 1).astype(int)
+        with ProcessPoolExecutor(workers, initializer=attach, initargs=(specs,)) as executor:
+            futures = [executor.submit(solve_draws, start, stop, mode, sigma, seed, cap, solver)
+                       for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+            results = sorted(future.result() for future in futures)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return tuple(np.concatenate([result[i] for result in results]) for i in (1, 2, 3))
+
+
+def bands(samples, share=band):
+    low, median, high = np.percentile(samples, [50 - share * 50, 50, 50 + share * 50])
+    return {'mean': samples.mean(), 'low': low, 'median': median, 'high': high}
+
+
+# Selection share per player, most often picked first, with whether the player is in the published roster
+def selection_frequency(merged_df, rosters, base):
+    counts = np.bincount(rosters.ravel(), minlength=len(merged_df))
+    df = merged_df[['player', 'Position', 'team_name', 'cps', 'cap_hit']].copy()
+    df['selected_share'] = counts / len(rosters)
+    df['in_base_roster'] = np.isin(np.arange(len(merged_df)), base)
+    df = df[(df['selected_share'] > 0) | df['in_base_roster']]
+    return df.sort_values(['selected_share', 'cps'], ascending=False).reset_index(drop=True)
+
+
+def load_pool():
+    merged_df = pd.read_csv(paths.merged_path, float_precision='round_trip')
+    merged_df['cap_hit'] = pool_arrays(merged_df)[1]
+    values, pos_index = pool_metrics(merged_df, pd.read_csv(paths.skater_stats_path, float_precision='round_trip'),
+                                     pd.read_csv(paths.goalie_stats_wins_path, float_precision='round_trip'))
+    return merged_df, values, pos_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--draws', type=int, default=n_draws)
+    parser.add_argument('--mode', choices=modes, default='metrics')
+    parser.add_argument('--sigma', type=float, help=f"noise level (default {default_sigma})")
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--solver', choices=['exact', 'cbc'], default='exact')
+    parser.add_argument('--cap', type=float, default=salary_cap)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    merged_df, values, pos_index = load_pool()
+    weights = cps.weight_matrix(cps.position_weights, cps.metrics)
+    cost = merged_df['cap_hit'].to_numpy(dtype=float)
+    base_value = np.nan_to_num(cps.score(values, pos_index, weights))
+    base = solve_roster_exact(base_value, cost, group_masks(merged_df['Position'].to_numpy()), args.cap)
+
+    rosters, totals, base_totals = simulate(values, pos_index, cost, weights, base, args.draws, args.mode,
+                                            args.sigma, args.seed, args.cap, args.solver, args.workers)
+
+    frequency = selection_frequency(merged_df, rosters, base)
+    frequency.to_csv(paths.robustness_path, index=False)
+    print(frequency.head(sum(roster_sizes.values()) + 10).to_string(index=False))
+    print(f"\n{args.draws} draws, {args.mode} noise, published roster total CPS {base_value[base].sum():.4f}")
+    for label, samples in (('Best roster per draw', totals), ('Published roster', base_totals)):
+        stats = bands(samples)
+        print(f"{label:<22} mean {stats['mean']:.4f}, median {stats['median']:.4f}, "
+              f"{band:.0%} band [{stats['low']:.4f}, {stats['high']:.4f}]")
+    kept = np.mean([np.isin(base, roster).mean() for roster in rosters])
+    print(f"On average {kept:.0%} of the published roster is still picked; saved to {paths.robustness_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""
+Roster optimization service: the player pool and the roster models stay loaded between queries
+
+Running analyze_data.py for every what-if pays for importing pandas and PuLP, reading and cleaning
+the merged CSV and building the model before CBC even starts. This service does all of that once at
+startup and then answers JSON queries over HTTP:
+
+    POST /roster   {"cap": 88e6, "sizes": {"forwards": 12, "defensemen": 6, "goalies": 2},
+                    "lock": ["Connor McDavid"], "exclude": ["Auston Matthews"],
+                    "profile": "offense_heavy", "solver": "cbc"}
+    GET  /metrics  request counts and p50/p99 latency
+    GET  /health
+
+Every field of a query is optional; left out, it takes the default roster settings from optimizer.py.
+"solver" is "cbc" (a prebuilt RosterModel, warm-started from the worker's previous roster) or "exact"
+(exact_roster). Queries run on a pool of workers, each with its own model, so concurrent queries never
+share a model. CBC runs as a subprocess, so the workers' solves run in parallel.
+
+Usage: python roster_service.py [--host HOST] [--port PORT] [--workers N] [--data merged.csv]
+
+Author: Kevin Kang
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import paths
+from cps import default_profile
+from exact_roster import solve_roster_exact
+from optimizer import InfeasibleRosterError, RosterModel, pool_arrays, roster_sizes, salary_cap
+from what_if import player_indices
+
+default_port = 8765
+default_workers = 4
+latency_window = 10_000  # Latencies kept for the percentiles
+solvers = ('cbc', 'exact')
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# The merged pool with CPS under every weight profile: {profile: value array}; the default is the merged cps
+def profile_values(merged_df, profile_cps_df):
+    values = pd.to_numeric(merged_df['cps'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    profiles = {default_profile: values}
+    if profile_cps_df is not None:
+        # profile_cps has the combined CPS rows in the same order, so the first row per player is the merged one
+        by_player = profile_cps_df.drop_duplicates(subset='Player').set_index('Player')
+        for profile in by_player.columns.drop('Position', errors='ignore'):
+            if profile != default_profile:
+                profiles[profile] = (merged_df['player'].map(by_player[profile]).fillna(0).to_numpy(dtype=float))
+    return profiles
+
+
+class RosterPool:
+    """The player pool, loaded once: value per profile, cost and group masks"""
+
+    def __init__(self, merged_df, profile_cps_df=None):
+        self.df = merged_df.reset_index(drop=True)
+        _, self.cost, self.masks = pool_arrays(self.df)
+        self.values = profile_values(self.df, profile_cps_df)
+
+    # The roster as JSON-ready rows plus totals
+    def describe(self, selected, profile):
+        value = self.values[profile]
+        rows = self.df.iloc[selected][['player', 'Position', 'team_name']].astype(object)
+        rows = rows.where(rows.notna(), None).to_dict('records')
+        for row, i in zip(rows, selected.tolist()):
+            row.update(cps=value[i], cap_hit=self.cost[i])
+        return {'roster': rows, 'total_cps': float(value[selected].sum()),
+                'total_cap_hit': float(self.cost[selected].sum())}
+
+
+class Worker:
+    """One prebuilt model and the profile its objective currently holds"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.model = RosterModel(pool.values[default_profile], pool.cost, pool.masks)
+        self.profile = default_profile
+        self.model.solve()  # Warm: the next solve starts from this roster
+
+    def solve(self, cap, sizes, locked, excluded, profile):
+        if profile != self.profile:
+            self.model.set_value(self.pool.values[profile])
+            self.profile = profile
+        self.model.set_cap(cap)
+        self.model.set_sizes(sizes)
+        self.model.lock(locked)
+        self.model.exclude(excluded)
+        try:
+            return self.model.solve()
+        finally:
+            self.model.release(np.concatenate([locked, excluded]))
+
+
+class Metrics:
+    """Request counts and latencies, shared by the handler threads"""
+
+    def __init__(self, window=latency_window):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.counts = {'requests': 0, 'errors': 0, 'infeasible': 0, 'failed': 0}
+        self.started = time.time()
+
+    def record(self, seconds, outcome='ok'):
+        with self.lock:
+            self.counts['requests'] += 1
+            if outcome != 'ok':
+                self.counts[outcome] += 1
+            self.latencies.append(seconds)
+
+    def report(self):
+        with self.lock:
+            latencies = np.array(self.latencies)
+            counts = dict(self.counts)
+        report = {**counts, 'uptime_s': time.time() - self.started, 'latency_ms': None}
+        if len(latencies):
+            p50, p99 = np.percentile(latencies * 1e3, [50, 99]).tolist()
+            report['latency_ms'] = {'p50': p50, 'p99': p99, 'mean': float(latencies.mean()) * 1e3,
+                                    'max': float(latencies.max()) * 1e3, 'window': len(latencies)}
+        return report
+
+
+class RosterService:
+    """The pool, a queue of warm workers and the executor that runs queries on them"""
+
+    def __init__(self, pool, n_workers=default_workers):
+        self.pool = pool
+        self.workers = queue.Queue()
+        for _ in range(n_workers):
+            self.workers.put(Worker(pool))
+        self.executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix='roster')
+        self.metrics = Metrics()
+        self.n_workers = n_workers
+
+    # Validate a JSON query into solve arguments
+    def parse(self, query):
+        unknown = set(query) - {'cap', 'sizes', 'lock', 'exclude', 'profile', 'solver'}
+        if unknown:
+            raise BadRequest(f"Unknown fields: {sorted(unknown)}")
+        try:
+            sizes = query.get('sizes', {})
+            if not isinstance(sizes, dict):
+                raise BadRequest('"sizes" must be an object of roster group: player count')
+            sizes = {**roster_sizes, **sizes}
+            if set(sizes) != set(roster_sizes):
+                raise BadRequest(f"Roster groups are {list(roster_sizes)}")
+            for field in ('lock', 'exclude'):
+                if not isinstance(query.get(field, []), list):
+                    raise BadRequest(f'"{field}" must be a list of player names')
+            both = set(query.get('lock', [])) & set(query.get('exclude', []))
+            if both:
+                raise BadRequest(f"Players both locked and excluded: {sorted(both)}")
+            profile = query.get('profile', default_profile)
+            if not isinstance(profile, str) or profile not in self.pool.values:
+                raise BadRequest(f"Unknown profile {profile!r} (profiles: {list(self.pool.values)})")
+            solver = query.get('solver', 'cbc')
+            if not isinstance(solver, str) or solver not in solvers:
+                raise BadRequest(f"Unknown solver {solver!r} (solvers: {list(solvers)})")
+            return {'cap': float(query.get('cap', salary_cap)), 'sizes': {g: int(n) for g, n in sizes.items()},
+                    'locked': player_indices(self.pool.df, query.get('lock', [])),
+                    'excluded': player_indices(self.pool.df, query.get('exclude', [])),
+                    'profile': profile, 'solver': solver}
+        except BadRequest:
+            raise
+        except (TypeError, ValueError) as error:
+            raise BadRequest(str(error)) from None
+
+    def solve(self, request):
+        if request['solver'] == 'exact':
+            return solve_roster_exact(self.pool.values[request['profile']], self.pool.cost, self.pool.masks,
+                                      request['cap'], request['sizes'], locked=request['locked'],
+                                      excluded=request['excluded'])
+        worker = self.workers.get()
+        try:
+            return worker.solve(request['cap'], request['sizes'], request['locked'], request['excluded'],
+                                request['profile'])
+        finally:
+            self.workers.put(worker)
+
+    # Answer one query: (HTTP status, JSON body)
+    def handle(self, query):
+        start = time.perf_counter()
+        try:
+            request = self.parse(query)
+            selected = self.executor.submit(self.solve, request).result()
+        except BadRequest as error:
+            self.metrics.record(time.perf_counter() - start, 'errors')
+            return 400, {'error': str(error)}
+        except InfeasibleRosterError as error:
+            self.metrics.record(time.perf_counter() - start, 'infeasible')
+            return 422, {'error': str(error)}
+        except Exception as error:
+            self.metrics.record(time.perf_counter() - start, 'failed')
+            return 500, {'error': f"{type(error).__name__}: {error}"}
+        elapsed = time.perf_counter() - start
+        self.metrics.record(elapsed)
+        return 200, {**self.pool.describe(selected, request['profile']), 'elapsed_ms': elapsed * 1e3}
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        # Anything a route raises is answered with a 500 instead of dropping the connection
+        def respond(self, route):
+            try:
+                route()
+            except Exception as error:
+                self.send_json(500, {'error': f"{type(error).__name__}: {error}"})
+
+        def do_GET(self):
+            self.respond(self.get)
+
+        def do_POST(self):
+            self.respond(self.post)
+
+        def get(self):
+            if self.path == '/metrics':
+                self.send_json(200, {**service.metrics.report(), 'workers': service.n_workers})
+            elif self.path == '/health':
+                self.send_json(200, {'status': 'ok', 'players': len(service.pool.df),
+                                     'profiles': list(service.pool.values)})
+            else:
+                self.send_json(404, {'error': f"Unknown path {self.path}"})
+
+        def post(self):
+            if self.path != '/roster':
+                self.send_json(404, {'error': f"Unknown path {self.path}"})
+                return
+            try:
+                query = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            except json.JSONDecodeError as error:
+                self.send_json(400, {'error': f"Invalid JSON: {error}"})
+                return
+            if not isinstance(query, dict):
+                self.send_json(400, {'error': "The query must be a JSON object"})
+                return
+            self.send_json(*service.handle(query))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def load_pool(merged_path=paths.merged_path, profile_cps_path=paths.profile_cps_path):
+    profile_cps_df = pd.read_csv(profile_cps_path, float_precision='round_trip')
+    return RosterPool(pd.read_csv(merged_path, float_precision='round_trip'), profile_cps_df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=default_port)
+    parser.add_argument('--workers', type=int, default=default_workers)
+    parser.add_argument('--data', default=paths.merged_path, help="merged CPS + salary CSV")
+    args = parser.parse_args()
+
+    service = RosterService(load_pool(args.data), args.workers)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Serving {len(service.pool.df)} players on http://{args.host}:{args.port} "
+          f"with {args.workers} workers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Versioned store of contract scrapes: one snapshot per date, kept as compact diffs
+
+Every snapshot is recorded in index.json. Most are stored as a diff against the snapshot before
+them: rows removed, rows added, and only the fields that changed in the remaining rows (a player's
+row is keyed by profile url). Every `keyframe_interval`-th snapshot is a full CSV, so loading a date
+replays at most that many diffs. Values are kept as the exact CSV text, so a loaded snapshot writes
+back to the same file the scrape would have written.
+
+Snapshots are looked up by date: 'latest', an exact date, or the latest snapshot on or before a date
+(for backtesting against the cap data of the time).
+
+Usage: python snapshots.py                       list the snapshots
+       python snapshots.py import <csv files...>  add dated scrape CSVs (all_player_contract_data_<date>.csv)
+       python snapshots.py export <date> <path>   write a snapshot out as CSV
+
+Author: Kevin Kang
+"""
+
+import io
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+import paths
+
+keyframe_interval = 30
+key_column = 'url'
+
+
+def today():
+    return datetime.today().strftime('%Y-%m-%d')
+
+
+# Every value as its CSV text, so snapshots compare and round-trip exactly
+def as_text(df):
+    return pd.read_csv(io.StringIO(df.to_csv(index=False)), dtype=str, keep_default_na=False)
+
+
+# Row keys: the url plus how many times it has appeared before (a scrape can list a player twice)
+def row_keys(df):
+    return (df[key_column] + '#' + df.groupby(key_column).cumcount().astype(str)).tolist()
+
+
+def make_diff(base, df):
+    base_rows = dict(zip(row_keys(base), base.to_dict('records')))
+    keys = row_keys(df)
+    rows = dict(zip(keys, df.to_dict('records')))
+
+    diff = {
+        'columns': list(df.columns) if list(df.columns) != list(base.columns) else None,
+        'removed': [key for key in base_rows if key not in rows],
+        'added': {key: rows[key] for key in keys if key not in base_rows},
+        'changed': {},
+        'order': None,
+    }
+    for key, row in rows.items():
+        old = base_rows.get(key)
+        if old is not None:
+            changed = {column: value for column, value in row.items() if old.get(column) != value}
+            if changed:
+                diff['changed'][key] = changed
+
+    # Order is only stored when it is not the base order with the added rows at the end
+    if keys != [key for key in base_rows if key in rows] + [key for key in keys if key not in base_rows]:
+        diff['order'] = keys
+    return diff
+
+
+# Apply a diff to {row key: row} (in row order) and the column list; returns both updated
+def apply_diff(rows, columns, diff):
+    for key in diff['removed']:
+        del rows[key]
+    for key, changed in diff['changed'].items():
+        rows[key] = {**rows[key], **changed}
+    rows.update(diff['added'])
+    if diff['order']:
+        rows = {key: rows[key] for key in diff['order']}
+    return rows, diff['columns'] or columns
+
+
+class SnapshotStore:
+    def __init__(self, root=paths.snapshot_dir):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        else:
+            self.entries = []
+
+    def dates(self):
+        return [entry['date'] for entry in self.entries]
+
+    # One row per snapshot: date, kind (full or diff), rows and changes
+    def index(self):
+        return pd.DataFrame(self.entries, columns=['date', 'kind', 'rows', 'added', 'removed', 'changed', 'file'])
+
+    # The snapshot date for `date`: None or 'latest', else the latest snapshot on or before it
+    def resolve(self, date=None):
+        dates = self.dates()
+        if not dates:
+            raise FileNotFoundError(f"No contract snapshots in {self.root}")
+        if date is None or date == 'latest':
+            return dates[-1]
+        earlier = [d for d in dates if d <= date]
+        if not earlier:
+            raise FileNotFoundError(f"No contract snapshot on or before {date} (first is {dates[0]})")
+        return earlier[-1]
+
+    # The snapshot as text (`raw`) or parsed like the scrape's CSV would be by pd.read_csv
+    def load(self, date=None, raw=False):
+        date = self.resolve(date)
+        position = self.dates().index(date)
+        start = max(i for i in range(position + 1) if self.entries[i]['kind'] == 'full')
+
+        df = pd.read_csv(self.path(self.entries[start]), dtype=str, keep_default_na=False)
+        rows, columns = dict(zip(row_keys(df), df.to_dict('records'))), list(df.columns)
+        for entry in self.entries[start + 1:position + 1]:
+            with open(self.path(entry), encoding='utf-8') as f:
+                rows, columns = apply_diff(rows, columns, json.load(f))
+
+        df = pd.DataFrame(list(rows.values()), columns=columns).fillna('')
+        return df if raw else pd.read_csv(io.StringIO(df.to_csv(index=False)))
+
+    def path(self, entry):
+        return os.path.join(self.root, entry['file'])
+
+    # Add the scrape `df` as the snapshot for `date` (today by default). Re-saving the latest date replaces it.
+    def save(self, df, date=None):
+        date = date or today()
+        if self.entries and date < self.entries[-1]['date']:
+            raise ValueError(f"Snapshot {date} is older than the latest ({self.entries[-1]['date']})")
+        if self.entries and date == self.entries[-1]['date']:
+            os.remove(self.path(self.entries.pop()))
+
+        df = as_text(df)
+        since_keyframe = next((n for n, entry in enumerate(reversed(self.entries)) if entry['kind'] == 'full'), None)
+        if since_keyframe is None or since_keyframe + 1 >= keyframe_interval:
+            entry = {'date': date, 'kind': 'full', 'rows': len(df), 'added': len(df), 'removed': 0, 'changed': 0,
+                     'file': os.path.join('full', f'{date}.csv')}
+            os.makedirs(os.path.dirname(self.path(entry)), exist_ok=True)
+            df.to_csv(self.path(entry), index=False)
+        else:
+            diff = make_diff(self.load(raw=True), df)
+            entry = {'date': date, 'kind': 'diff', 'rows': len(df), 'added': len(diff['added']),
+                     'removed': len(diff['removed']), 'changed': len(diff['changed']),
+                     'file': os.path.join('diff', f'{date}.json')}
+            os.makedirs(os.path.dirname(self.path(entry)), exist_ok=True)
+            with open(self.path(entry), 'w', encoding='utf-8') as f:
+                json.dump(diff, f, ensure_ascii=False, separators=(',', ':'))
+
+        self.entries.append(entry)
+        self.write_index()
+        return date
+
+    def write_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1)
+
+    # Add dated scrape CSVs (all_player_contract_data_<date>.csv) in date order; returns the dates added
+    def import_csvs(self, csv_paths):
+        dated = []
+        for path in csv_paths:
+            match = re.search(r'(\d{4}-\d{2}-\d{2})\.csv$', path)
+            if not match:
+                raise ValueError(f"No date in file name: {path}")
+            dated.append((match.group(1), path))
+        for date, path in sorted(dated):
+            self.save(pd.read_csv(path, dtype=str, keep_default_na=False), date)
+        return [date for date, _ in sorted(dated)]
+
+
+def main():
+    store = SnapshotStore()
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    if command == 'import':
+        print(f"Imported {store.import_csvs(sys.argv[2:])}")
+    elif command == 'export':
+        store.load(sys.argv[2], raw=True).to_csv(sys.argv[3], index=False)
+    else:
+        print(store.index().to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Offline Spotrac stand-in: renders team and player pages from a contract CSV and serves them over local HTTP
+
+The rendered markup mirrors the parts of spotrac.com that get_data reads, so scraping the local
+server reproduces the rows of the source CSV. Used by the scraper and parser benchmarks.
+
+Author: Kevin Kang
+"""
+
+import html
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from get_data import teams
+
+
+# Filler markup so pages are closer to the size of real Spotrac pages
+def make_padding(items):
+    return ''.join(
+        f'<div class="nav-item"><a href="/nhl/news/{i}">Headline {i}</a><span>Story teaser {i}</span></div>'
+        for i in range(items)
+    )
+
+
+page_padding = make_padding(30)
+
+
+def money(value):
+    if pd.isna(value) or value == '-':
+        return '-'
+    return f"${int(float(value)):,}"
+
+
+def player_id(url):
+    return url.rstrip('/').split('/')[-1]
+
+
+def render_team_page(team_df, host, padding=page_padding):
+    rows = []
+    for _, row in team_df.iterrows():
+        url = f"{host}/nhl/player/_/id/{player_id(row['url'])}"
+        rows.append(
+            '<tr>'
+            f'<td><a href="{url}">{html.escape(row["name"])}</a></td>'
+            '<td>F</td>'
+            f'<td>{money(row["cap_hit"])}</td>'
+            '<td>-</td>'
+            f'<td>{row["cap_hit_pct"]}%</td>'
+            f'<td>{money(row["base_salary"])}</td>'
+            f'<td>{money(row["signing_bonus"])}</td>'
+            '</tr>'
+        )
+    return (
+        f'<html><head><title>Cap</title></head><body>{padding}'
+        '<table class="table-internal-sort"><tr><th>Player</th></tr>'
+        f'{"".join(rows)}</table>{padding}</body></html>'
+    )
+
+
+def render_player_page(row, padding=page_padding):
+    def labeled(label, value, tag='span'):
+        if pd.isna(value):
+            return ''
+        return f'<div class="item"><strong>{label}</strong><{tag}>{html.escape(str(value))}</{tag}></div>'
+
+    age = f"{row['age']} ({row['birthday']})" if not pd.isna(row['age']) else None
+    return (
+        f'<html><head><title>{html.escape(row["name"])}</title></head><body>{padding}'
+        + labeled('Contract Terms:', f"{row['contract_years_signed']} yr(s) / {money(row['salary_signed'])}", 'div')
+        + labeled('Free Agent:', f"{row['free_agent_year']} / {row['status_after_contract']}", 'div')
+        + labeled('Age:', age)
+        + labeled('Exp:', row['experience'])
+        + labeled('Country:', row['country'])
+        + labeled('College:', row['college'])
+        + labeled('Drafted:', row['drafted'])
+        + f'{padding}</body></html>'
+    )
+
+
+# Write the site to `html_dir` as plain files laid out like the real URLs
+def write_site(contract_csv, html_dir, host):
+    df = pd.read_csv(contract_csv)
+    for slug, team_name in teams.items():
+        team_dir = os.path.join(html_dir, 'nhl', slug, 'cap')
+        os.makedirs(team_dir, exist_ok=True)
+        with open(os.path.join(team_dir, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(render_team_page(df[df['team_name'] == team_name], host))
+
+    player_dir = os.path.join(html_dir, 'nhl', 'player', '_', 'id')
+    os.makedirs(player_dir, exist_ok=True)
+    for _, row in df.iterrows():
+        with open(os.path.join(player_dir, player_id(row['url'])), 'w', encoding='utf-8') as f:
+            f.write(render_player_page(row))
+    return html_dir
+
+
+# Static file server with a fixed per-request delay to stand in for network latency
+class LocalSpotrac:
+    def __init__(self, html_dir, latency=0.01, port=0):
+        class Handler(SimpleHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=html_dir, **kwargs)
+
+            def do_GET(self):
+                time.sleep(latency)
+                super().do_GET()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,187 @@
+"""
+HTML parsing backends for Spotrac pages
+
+Each backend pulls out just what get_data needs: the rows of the team cap table, and the labeled
+fields of a player profile collected in a single walk over the document instead of one full-tree
+search per label. selectolax and lxml are used when installed, otherwise BeautifulSoup's
+html.parser (what get_data always used).
+
+Author: Kevin Kang
+"""
+
+from bs4 import BeautifulSoup, NavigableString, Tag, UnicodeDammit
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Profile labels and the tag whose text holds each value (the first such tag after the label)
+profile_labels = {
+    'Contract Terms:': 'div',
+    'Free Agent:': 'div',
+    'Age:': 'span',
+    'Exp:': 'span',
+    'Country:': 'span',
+    'College:': 'span',
+    'Drafted:': 'span',
+}
+
+team_table_class = 'table-internal-sort'
+
+
+def available_backends():
+    backends = []
+    if LexborHTMLParser is not None:
+        backends.append('selectolax')
+    if lxml_html is not None:
+        backends.append('lxml')
+    backends.append('html.parser')
+    return backends
+
+
+default_backend = available_backends()[0]
+
+
+# Tracks labels seen so far and resolves each one with the next tag of the expected kind
+class LabelCollector:
+    def __init__(self):
+        self.fields = {}
+        self.pending = {}
+
+    def text(self, value):
+        tag = profile_labels.get(value)
+        if tag is not None and value not in self.fields and value not in self.pending.get(tag, ()):
+            self.pending.setdefault(tag, []).append(value)
+
+    def tag(self, name, get_text):
+        labels = self.pending.pop(name, None)
+        if labels:
+            value = get_text()
+            for label in labels:
+                self.fields[label] = value
+
+    def done(self):
+        return len(self.fields) == len(profile_labels)
+
+
+# --- html.parser (BeautifulSoup) ---
+
+def bs4_team_rows(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    table = soup.find('table', {'class': team_table_class})
+    rows = []
+    for row in table.find_all('tr'):
+        link = row.find('a')
+        rows.append({
+            'link': (link.text, link['href']) if link is not None else None,
+            'cells': [col.text for col in row.find_all('td')],
+        })
+    return rows
+
+
+def bs4_profile_fields(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    collector = LabelCollector()
+    for node in soup.descendants:
+        if isinstance(node, Tag):
+            collector.tag(node.name, node.get_text)
+        elif isinstance(node, NavigableString):
+            collector.text(str(node))
+        if collector.done():
+            break
+    return collector.fields
+
+
+# --- lxml ---
+
+# lxml assumes Latin-1 for bytes without a charset declaration, so detect the encoding the way bs4 does
+def lxml_root(content):
+    if isinstance(content, bytes):
+        content = UnicodeDammit(content, is_html=True).unicode_markup
+    return lxml_html.fromstring(content)
+
+
+def lxml_team_rows(content):
+    root = lxml_root(content)
+    table = root.xpath(
+        f'//table[contains(concat(" ", normalize-space(@class), " "), " {team_table_class} ")]'
+    )[0]
+    rows = []
+    for row in table.iter('tr'):
+        link = next(row.iter('a'), None)
+        rows.append({
+            'link': (link.text_content(), link.get('href')) if link is not None else None,
+            'cells': [col.text_content() for col in row.iter('td')],
+        })
+    return rows
+
+
+def lxml_profile_fields(content):
+    root = lxml_root(content)
+    collector = LabelCollector()
+    # Start/end events visit tags and text (element text, then tail after the subtree) in document order
+    for event, element in etree.iterwalk(root, events=('start', 'end')):
+        if not isinstance(element.tag, str):
+            if event == 'end' and element.tail:
+                collector.text(element.tail)
+            continue
+        if event == 'start':
+            collector.tag(element.tag, element.text_content)
+            if element.text:
+                collector.text(element.text)
+        elif element.tail:
+            collector.text(element.tail)
+        if collector.done():
+            break
+    return collector.fields
+
+
+# --- selectolax (lexbor) ---
+
+def selectolax_team_rows(content):
+    tree = LexborHTMLParser(content)
+    table = tree.css_first(f'table.{team_table_class}')
+    rows = []
+    for row in table.css('tr'):
+        link = row.css_first('a')
+        rows.append({
+            'link': (link.text(), link.attributes.get('href')) if link is not None else None,
+            'cells': [col.text() for col in row.css('td')],
+        })
+    return rows
+
+
+def selectolax_profile_fields(content):
+    tree = LexborHTMLParser(content)
+    collector = LabelCollector()
+    for node in tree.root.traverse(include_text=True):
+        if node.tag == '-text':
+            collector.text(node.text(deep=False))
+        elif not node.tag.startswith('-'):
+            collector.tag(node.tag, node.text)
+        if collector.done():
+            break
+    return collector.fields
+
+
+backends = {
+    'selectolax': (selectolax_team_rows, selectolax_profile_fields),
+    'lxml': (lxml_team_rows, lxml_profile_fields),
+    'html.parser': (bs4_team_rows, bs4_profile_fields),
+}
+
+
+# Rows of the team cap table as {'link': (name, url) or None, 'cells': [td text, ...]}, header included
+def team_rows(content, backend=None):
+    return backends[backend or default_backend][0](content)
+
+
+# {label: text of the tag following the label} for every profile label present on the page
+def profile_fields(content, backend=None):
+    return backends[backend or default_backend][1](content)
@@ -0,0 +1,164 @@
+"""
+Columnar storage (Parquet or Feather) for the pipeline's tables, with an explicit schema per table
+
+CSV stays the default. A table written as Parquet or Feather keeps its column types, so a later
+stage does not re-infer them or re-clean strings: cap hits are numbers, contract years are
+nullable integers, Position and team_name are categorical, and the '-' placeholders in the stats
+exports are already 0. Reads take a column list and only load those columns; Feather files are
+written uncompressed and memory-mapped, so numeric columns can be read without a copy.
+
+The format is picked from the file extension (.csv, .parquet, .feather). Parquet and Feather need
+pyarrow.
+
+Usage: python storage.py [parquet|feather]   (converts the existing CSVs next to themselves)
+
+Author: Kevin Kang
+"""
+
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import paths
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+formats = {'.csv': 'csv', '.parquet': 'parquet', '.feather': 'feather'}
+
+# dtypes: {column: dtype}; other: dtype for every column not listed (None keeps it as read);
+# dash: the value stored for a '-' placeholder in a numeric column
+Schema = namedtuple('Schema', ['dtypes', 'other', 'dash'])
+
+contract_dtypes = {
+    'url': 'string',
+    'cap_hit': 'float64',
+    'cap_hit_pct': 'float64',
+    'base_salary': 'float64',
+    'signing_bonus': 'float64',
+    'contract_start_year': 'Int16',
+    'contract_years_signed': 'Int8',
+    'contract_years_left': 'Int8',
+    'free_agent_year': 'Int16',
+    'salary_signed': 'float64',
+    'status_after_contract': 'category',
+    'age': 'string',
+    'birthday': 'string',
+    'experience': 'string',
+    'country': 'category',
+    'college': 'string',
+    'drafted': 'string',
+    'team_name': 'category',
+}
+stats_dtypes = {'Player': 'string', 'Team': 'category', 'Position': 'category'}
+cps_dtypes = {'Player': 'string', 'Position': 'category'}
+
+schemas = {
+    'contracts': Schema({'name': 'string', **contract_dtypes}, None, np.nan),
+    'raw_player_stats': Schema(stats_dtypes, 'float64', 0),
+    'raw_goalie_stats': Schema({'Player': 'string', 'Team': 'category'}, 'float64', 0),
+    'raw_plus_minus': Schema({'Player': 'string', 'Team': 'category', '+/-': 'float64'}, None, np.nan),
+    'raw_goalie_wins': Schema({'Player': 'string', 'Team': 'category', 'W': 'float64'}, None, np.nan),
+    'skater_stats': Schema(stats_dtypes, 'float64', 0),
+    'goalie_stats': Schema({'Player': 'string', 'Team': 'category'}, 'float64', 0),
+    'skater_cps': Schema(cps_dtypes, 'float64', np.nan),
+    'goalie_cps': Schema(cps_dtypes, 'float64', np.nan),
+    'combined_cps': Schema(cps_dtypes, 'float64', np.nan),
+    'profile_cps': Schema(cps_dtypes, 'float64', np.nan),
+    'merged': Schema({'player': 'string', 'Position': 'category', 'cps': 'float64', **contract_dtypes}, None, np.nan),
+    'roster': Schema({'Player': 'string', 'Position': 'category', 'CPS': 'float64', 'Cap Hit': 'int64'}, None, np.nan),
+}
+
+
+def table_format(path):
+    return formats.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+# The same path with the extension for `fmt`
+def format_path(path, fmt):
+    return os.path.splitext(path)[0] + ('.csv' if fmt == 'csv' else f'.{fmt}')
+
+
+def require_pyarrow(fmt):
+    if feather is None:
+        raise ImportError(f"Reading or writing {fmt} files needs pyarrow (pip install pyarrow)")
+
+
+# Numbers from formatted strings ('$1,000,000', '10.8%'), with '-' read as `dash`
+def to_number(series, dtype, dash=np.nan):
+    if not pd.api.types.is_numeric_dtype(series):
+        series = series.astype('string').str.replace(r'[\$,%]', '', regex=True).str.strip()
+        series = pd.to_numeric(series.mask(series == '-', str(dash)), errors='coerce')
+    if dtype.startswith('Int'):
+        return series.round().astype(dtype)
+    return series.astype(dtype)
+
+
+# Coerce a table's columns to its schema; columns the schema does not cover keep their type
+def apply_schema(df, schema):
+    df = df.copy()
+    for column in df.columns:
+        dtype = schema.dtypes.get(column, schema.other)
+        if dtype is None or str(df[column].dtype) == dtype:
+            continue
+        if dtype in ('string', 'category'):
+            df[column] = df[column].astype(dtype)
+        else:
+            df[column] = to_number(df[column], dtype, schema.dash)
+    return df
+
+
+# Read `path` (any format), loading only `columns` when given; CSVs are coerced to `schema`
+def read_table(path, columns=None, schema=None):
+    fmt = table_format(path)
+    if fmt == 'parquet':
+        require_pyarrow(fmt)
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+    if fmt == 'feather':
+        require_pyarrow(fmt)
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas(split_blocks=True)
+    df = pd.read_csv(path, usecols=columns, float_precision='round_trip')
+    return apply_schema(df, schema) if schema is not None else df
+
+
+# Write `df` to `path` in the format its extension names; Parquet and Feather are coerced to `schema` first
+def write_table(df, path, schema=None):
+    fmt = table_format(path)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+        return
+    require_pyarrow(fmt)
+    if schema is not None:
+        df = apply_schema(df, schema)
+    df = df.reset_index(drop=True)
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        feather.write_feather(df, path, compression='uncompressed')
+
+
+# Convert the existing CSV of every table in `table_paths` ({table: csv path}) to `fmt`
+def convert(table_paths, fmt='parquet'):
+    written = []
+    for table, path in table_paths.items():
+        if path is None or not os.path.exists(path):
+            continue
+        target = format_path(path, fmt)
+        write_table(pd.read_csv(path, float_precision='round_trip'), target, schemas.get(table))
+        written.append(target)
+    return written
+
+
+def main():
+    fmt = sys.argv[1] if len(sys.argv) > 1 else 'parquet'
+    for target in convert(paths.table_paths, fmt):
+        print(f"Wrote {target}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""
+Synthetic league-scale inputs: the four stats exports and a contract scrape, `scale` times the real size
+
+Every synthetic player starts from a real row (sampled with replacement), so the columns keep the real
+distributions and their correlations. Numeric values get Gaussian noise (a tenth of the column's
+standard deviation), are clipped to the real column's range and keep its integer or decimal format.
+'-' placeholders and other text stay as they are.
+
+Names are a random real first name with a random real last name, so they look like the real ones and
+collide now and then, as two real Sebastian Ahos do. On top of that, `duplicate_share` of the players
+reuse another synthetic player's name. The other exports spell `variant_share` of the names differently
+(Matt for Matthew, accents dropped), the way the real sources disagree. About the real share of
+players have a contract, and a few contracts are for players with no stats.
+
+Files are written in the same layout as the real exports (quoted, BOM and unnamed index column for
+the Natural Stat Trick tables), with the same file names, into data/synthetic/x<scale>/.
+
+Usage: python synthetic_data.py [scale...] [--seed N]
+
+Author: Kevin Kang
+"""
+
+import argparse
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+import paths
+from name_resolution import first_name_aliases, fold
+from snapshots import SnapshotStore
+
+duplicate_share = 0.01
+variant_share = 0.05
+contract_only_share = 0.03
+noise = 0.1
+contract_date = '2024-09-19'
+
+# Short first names for the full ones (Matthew -> Matt), to spell a name the way another source might
+short_first_names = {}
+for short, full in first_name_aliases.items():
+    short_first_names.setdefault(full, short)
+
+file_names = {
+    'player_stats': os.path.basename(paths.player_stats_path),
+    'plus_minus': os.path.basename(paths.plus_minus_path),
+    'goalie_stats': os.path.basename(paths.goalie_stats_path),
+    'goalie_wins': os.path.basename(paths.goalie_wins_path),
+}
+
+
+def scale_dir(scale, root=paths.synthetic_dir):
+    return os.path.join(root, f'x{scale}')
+
+
+# The files for `scale` in `directory`: {table: path}, with the contract scrape under 'contracts'
+def synthetic_paths(directory):
+    return {**{table: os.path.join(directory, name) for table, name in file_names.items()},
+            'contracts': paths.contract_path(contract_date, directory)}
+
+
+# The real tables as text, the way the files store them (the unnamed index column keeps its empty header)
+def load_real():
+    read = lambda path: pd.read_csv(path, dtype=str, keep_default_na=False,
+                                    encoding='utf-8-sig').rename(columns={'Unnamed: 0': ''})
+    return {
+        'player_stats': read(paths.player_stats_path),
+        'plus_minus': read(paths.plus_minus_path),
+        'goalie_stats': read(paths.goalie_stats_path),
+        'goalie_wins': read(paths.goalie_wins_path),
+        'contracts': SnapshotStore().load(contract_date, raw=True),
+    }
+
+
+# Noise on every numeric column of the text table `df`, clipped to the column's range, in its own number format.
+# Values that are not numbers ('-', '--', '1,770') are kept.
+def jitter(df, rng, skip=()):
+    df = df.copy()
+    for column in df.columns:
+        if column in skip:
+            continue
+        text = df[column]
+        numbers = pd.to_numeric(text, errors='coerce')
+        numeric = numbers.notna().to_numpy()
+        if not numeric.any():
+            continue
+        values = numbers.to_numpy()[numeric]
+        jittered = values + rng.normal(0, noise * values.std(), size=len(values))
+        jittered = np.clip(jittered, values.min(), values.max())
+
+        decimals = text[numeric].str.partition('.')[2].str.len().max()
+        if decimals == 0:
+            formatted = np.round(jittered).astype(np.int64).astype(str)
+        else:
+            formatted = np.char.mod(f'%.{min(decimals, 10)}f', jittered)
+        column_values = text.to_numpy(dtype=object)
+        column_values[numeric] = formatted
+        df[column] = column_values
+    return df
+
+
+# `n` names from the real first and last names; `duplicate_share` of them repeat an earlier one
+def synthetic_names(n, real_names, rng):
+    split = [name.split(' ', 1) for name in real_names if ' ' in name]
+    firsts = np.array([first for first, _ in split])
+    lasts = np.array([last for _, last in split])
+    names = np.char.add(np.char.add(rng.choice(firsts, size=n), ' '), rng.choice(lasts, size=n)).astype(object)
+    duplicates = rng.random(n) < duplicate_share
+    duplicates[0] = False
+    names[duplicates] = names[rng.integers(0, np.maximum(np.flatnonzero(duplicates), 1))]
+    return names
+
+
+# How another source might spell `name`: a short first name, or no accents
+def variant(name):
+    first, _, rest = name.partition(' ')
+    short = short_first_names.get(first.lower())
+    if short:
+        return f"{short.capitalize()} {rest}"
+    return fold(name)
+
+
+def spell(names, rng):
+    names = names.copy()
+    varied = np.flatnonzero(rng.random(len(names)) < variant_share)
+    names[varied] = [variant(name) for name in names[varied]]
+    return names
+
+
+# A stats table of `n` rows sampled from `real` with jittered numbers; returns it and the sampled real rows
+def sample_rows(real, n, rng, skip=()):
+    rows = rng.integers(0, len(real), size=n)
+    return jitter(real.iloc[rows].reset_index(drop=True), rng, skip), rows
+
+
+# Rows of `other` (a second export keyed by Player) for the players in `source_names`, random where missing
+def matching_rows(other, source_names, rng):
+    position = {name: i for i, name in enumerate(other['Player'])}
+    return np.array([position.get(name, rng.integers(0, len(other))) for name in source_names])
+
+
+def generate(scale, seed=0):
+    rng = np.random.default_rng(seed)
+    real = load_real()
+    real_names = pd.concat([real['player_stats']['Player'], real['goalie_stats']['Player'],
+                            real['contracts']['name']]).unique()
+    n_skaters = len(real['player_stats']) * scale
+    n_goalies = len(real['goalie_stats']) * scale
+    names = synthetic_names(n_skaters + n_goalies, real_names, rng)
+    skater_names, goalie_names = names[:n_skaters], names[n_skaters:]
+
+    index_column = real['player_stats'].columns[0]
+    skaters, skater_rows = sample_rows(real['player_stats'], n_skaters, rng, skip=(index_column, 'Player'))
+    skaters['Player'] = skater_names
+    skaters[index_column] = np.arange(1, n_skaters + 1).astype(str)
+
+    goalies, goalie_rows = sample_rows(real['goalie_stats'], n_goalies, rng, skip=(index_column, 'Player'))
+    goalies['Player'] = goalie_names
+    goalies[index_column] = np.arange(1, n_goalies + 1).astype(str)
+
+    # The second exports follow the same real players, so plus/minus and wins stay plausible for each row
+    pm_rows = matching_rows(real['plus_minus'], real['player_stats']['Player'].to_numpy()[skater_rows], rng)
+    plus_minus = jitter(real['plus_minus'].iloc[pm_rows].reset_index(drop=True), rng, skip=('Player', 'Season'))
+    plus_minus['Player'] = spell(skater_names, rng)
+
+    wins_rows = matching_rows(real['goalie_wins'], real['goalie_stats']['Player'].to_numpy()[goalie_rows], rng)
+    wins = jitter(real['goalie_wins'].iloc[wins_rows].reset_index(drop=True), rng, skip=('Player', 'Season'))
+    wins['Player'] = spell(goalie_names, rng)
+
+    # Contracts for the real share of players, plus a few for players with no stats
+    contract_share = len(real['contracts']) / (len(real['player_stats']) + len(real['goalie_stats']))
+    signed = names[rng.random(len(names)) < contract_share]
+    extra = synthetic_names(int(len(signed) * contract_only_share), real_names, rng)
+    contract_names = np.concatenate([spell(signed, rng), extra])
+    contracts, _ = sample_rows(real['contracts'], len(contract_names), rng, skip=('name', 'url', 'contract_start_year',
+                                                                               'free_agent_year'))
+    contracts['name'] = contract_names
+    contracts['url'] = [f'https://www.spotrac.com/nhl/player/_/id/{900000 + i}' for i in range(len(contracts))]
+    order = rng.permutation(len(contracts))
+    contracts = contracts.iloc[order].reset_index(drop=True)
+
+    return {'player_stats': skaters, 'plus_minus': plus_minus.iloc[rng.permutation(len(plus_minus))],
+            'goalie_stats': goalies, 'goalie_wins': wins.iloc[rng.permutation(len(wins))], 'contracts': contracts}
+
+
+# Write the tables in the real files' layouts
+def write(tables, directory):
+    os.makedirs(directory, exist_ok=True)
+    files = synthetic_paths(directory)
+    for table in ('player_stats', 'goalie_stats'):
+        tables[table].to_csv(files[table], index=False, quoting=csv.QUOTE_ALL, encoding='utf-8-sig')
+    for table in ('plus_minus', 'goalie_wins', 'contracts'):
+        tables[table].to_csv(files[table], index=False)
+    return files
+
+
+# The synthetic files for `scale`, generated unless they already exist
+def ensure(scale, seed=0, root=paths.synthetic_dir):
+    directory = scale_dir(scale, root)
+    files = synthetic_paths(directory)
+    if not all(os.path.exists(path) for path in files.values()):
+        write(generate(scale, seed), directory)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('scales', nargs='*', type=int, default=[10])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        files = write(generate(scale, args.seed), scale_dir(scale))
+        counts = {table: len(pd.read_csv(path, usecols=[0])) for table, path in files.items()}
+        print(f"x{scale}: {counts} in {scale_dir(scale)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Best single trades and signings for a current roster: one-for-one swaps, and two-for-ones with a signing
+
+Every swap is scored from arrays, without building a model:
+
+- one-for-one: a roster player out, a candidate of the same group (forward, defenseman, goalie) in.
+  The change in CPS and cap is exact.
+- two-for-one plus fill ('2-for-1+fill'): two roster players out, a candidate in, in the group of one
+  of them. The roster sizes are fixed, so the spot left open in the other group is filled by signing
+  a second candidate (the 'fill' column): the best one the freed cap room can buy, looked up per group
+  from a running maximum of CPS over candidates sorted by cap hit. This is an upper bound: the fill may
+  turn out to be the incoming player himself. A bare two-for-one would leave the roster a player short.
+
+Swaps over the cap, or without a CPS gain of at least `min_gain`, are dropped. The two-for-ones with the
+largest estimated gains are then re-solved with the exact optimizer (the rest of the roster locked,
+the open spot picked from the candidates). This gives their true fill and gain.
+
+Candidates are every merged player not on the roster, or only the upcoming free agents (--pool ufa:
+status_after_contract UFA and at most --years-left contract years left). A free agent is priced at his
+current cap hit.
+
+Usage: python trades.py [--roster optimized_team.csv] [--pool all|ufa|rfa] [--years-left N] [--cap X] [--top N]
+
+Author: Kevin Kang
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import paths
+from exact_roster import solve_roster_exact
+from optimizer import InfeasibleRosterError, roster_groups, roster_sizes, salary_cap
+from player_pool import PlayerPool
+
+min_gain = 1e-9
+top_n = 10
+verify_count = 50  # Two-for-ones re-solved by the optimizer
+pools = ('all', 'ufa', 'rfa')
+
+
+# Group number per player (index into roster_groups) from the group masks, -1 for positions outside every group
+def group_codes(masks):
+    codes = np.full(len(next(iter(masks.values()))), -1)
+    for g, group in enumerate(roster_groups):
+        codes[masks[group]] = g
+    return codes
+
+
+# Candidate players: everyone off the roster, or the ones heading to free agency of `kind`
+def candidate_indices(pool, roster, kind='all', years_left=None):
+    candidates = np.ones(len(pool), dtype=bool)
+    candidates[roster] = False
+    if kind != 'all':
+        candidates &= (pool.metadata['status_after_contract'] == kind.upper()).to_numpy()
+    if years_left is not None:
+        candidates &= (pool.years_left >= 0) & (pool.years_left <= years_left)
+    return np.flatnonzero(candidates)
+
+
+# Per group: candidate costs ascending and the best value at or below each cost, for fill lookups
+def fill_tables(candidates, value, cost, codes):
+    tables = []
+    for g in range(len(roster_groups)):
+        members = candidates[codes[candidates] == g]
+        order = members[np.argsort(cost[members], kind='stable')]
+        tables.append((cost[order], np.maximum.accumulate(value[order]) if len(order) else value[order]))
+    return tables
+
+
+# Best candidate value in group `groups` affordable with `room` (vectorized); NaN where nothing fits
+def best_fill(tables, groups, room):
+    fill = np.full(len(room), np.nan)
+    for g, (costs, best) in enumerate(tables):
+        rows = np.flatnonzero(groups == g)
+        position = np.searchsorted(costs, room[rows], side='right') - 1
+        fits = position >= 0
+        fill[rows[fits]] = best[position[fits]]
+    return fill
+
+
+def one_for_one(roster, candidates, value, cost, codes, room):
+    out, incoming = np.meshgrid(roster, candidates, indexing='ij')
+    out, incoming = out.ravel(), incoming.ravel()
+    gain = value[incoming] - value[out]
+    cap_change = cost[incoming] - cost[out]
+    keep = (codes[incoming] == codes[out]) & (cap_change <= room) & (gain >= min_gain)
+    return pd.DataFrame({'kind': '1-for-1', 'out_1': out[keep], 'out_2': -1, 'in': incoming[keep], 'fill': -1,
+                         'cps_gain': gain[keep], 'cap_change': cap_change[keep]})
+
+
+def two_for_one(roster, candidates, value, cost, codes, room, tables):
+    first, second = np.triu_indices(len(roster), k=1)
+    a, b = roster[first], roster[second]
+    pairs, incoming = np.meshgrid(np.arange(len(a)), candidates, indexing='ij')
+    pairs, incoming = pairs.ravel(), incoming.ravel()
+    a, b = a[pairs], b[pairs]
+
+    # The incoming player takes the spot of the outgoing player in his group; the other spot is filled
+    takes_a = codes[incoming] == codes[a]
+    takes_b = codes[incoming] == codes[b]
+    valid = takes_a | takes_b
+    open_group = np.where(takes_a, codes[b], codes[a])
+    spent = cost[incoming] - cost[a] - cost[b]
+    fill = best_fill(tables, open_group, room - spent)
+    gain = value[incoming] + fill - value[a] - value[b]
+    keep = valid & ~np.isnan(fill) & (gain >= min_gain)
+    return pd.DataFrame({'kind': '2-for-1+fill', 'out_1': a[keep], 'out_2': b[keep], 'in': incoming[keep], 'fill': -1,
+                         'cps_gain': gain[keep], 'cap_change': spent[keep]})
+
+
+# Re-solve a two-for-one exactly: the roster after the swap locked, the open spot chosen from the candidates
+def solve_swap(swap, roster, candidates, value, cost, masks, cap):
+    kept = np.setdiff1d(roster, [swap['out_1'], swap['out_2']])
+    locked = np.append(kept, swap['in'])
+    allowed = np.zeros(len(value), dtype=bool)
+    allowed[candidates] = True
+    allowed[locked] = True
+    pool_masks = {group: mask & allowed for group, mask in masks.items()}
+    selected = solve_roster_exact(value, cost, pool_masks, cap, roster_sizes, locked=locked)
+    fill = np.setdiff1d(selected, locked)[0]
+    return fill, value[selected].sum() - value[roster].sum(), cost[selected].sum() - cost[roster].sum()
+
+
+# All improving swaps for `roster` (indices into the pool), best first; the top two-for-ones are re-solved
+def evaluate(pool, roster, candidates, cap=salary_cap, verify=verify_count):
+    value, cost, masks = pool.arrays()
+    # Gains and cap changes are sums over several players, so they are taken in float64
+    value, cost = value.astype(float), cost.astype(float)
+    codes = group_codes(masks)
+    room = cap - cost[roster].sum()
+
+    singles = one_for_one(roster, candidates, value, cost, codes, room)
+    doubles = two_for_one(roster, candidates, value, cost, codes, room, fill_tables(candidates, value, cost, codes))
+    doubles = doubles.nlargest(verify, 'cps_gain')
+
+    solved = []
+    for swap in doubles.to_dict('records'):
+        try:
+            fill, gain, cap_change = solve_swap(swap, roster, candidates, value, cost, masks, cap)
+        except InfeasibleRosterError:
+            continue
+        solved.append({**swap, 'fill': fill, 'cps_gain': gain, 'cap_change': cap_change})
+    doubles = pd.DataFrame(solved, columns=doubles.columns)
+    doubles = doubles[doubles['cps_gain'] >= min_gain]
+
+    # The same two players coming in, either way round, is one swap
+    arriving = np.sort(doubles[['in', 'fill']].to_numpy(dtype=np.int64), axis=1)
+    doubles = doubles[~pd.DataFrame({'out_1': doubles['out_1'].to_numpy(), 'out_2': doubles['out_2'].to_numpy(),
+                                     'a': arriving[:, 0], 'b': arriving[:, 1]}).duplicated().to_numpy()]
+
+    swaps = pd.concat([singles, doubles], ignore_index=True).sort_values('cps_gain', ascending=False)
+    swaps['cap_room_after'] = room - swaps['cap_change']
+    return swaps.reset_index(drop=True)
+
+
+# Swaps with player names in place of indices
+def describe(swaps, pool):
+    names = np.array(pool.names['players'], dtype=object)[pool.player_id]
+    described = swaps.copy()
+    for column in ('out_1', 'out_2', 'in', 'fill'):
+        described[column] = np.where(swaps[column] >= 0, names[swaps[column].clip(lower=0)], '')
+    return described
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--roster', default=paths.roster_path, help='CSV with a Player column (default: the optimized team)')
+    parser.add_argument('--pool', choices=pools, default='all', help='candidates: everyone off the roster, or UFAs/RFAs')
+    parser.add_argument('--years-left', type=int, help='only candidates with at most this many contract years left')
+    parser.add_argument('--cap', type=float, default=salary_cap)
+    parser.add_argument('--top', type=int, default=top_n)
+    args = parser.parse_args()
+
+    pool = PlayerPool.from_frame(pd.read_csv(paths.merged_path, float_precision='round_trip'))
+    roster = pool.indices(pd.read_csv(args.roster, float_precision='round_trip')['Player'])
+    counts = {group: int(mask[roster].sum()) for group, mask in pool.masks().items()}
+    if counts != roster_sizes:
+        raise ValueError(f"The roster has {counts}, expected {roster_sizes}")
+    candidates = candidate_indices(pool, roster, args.pool, args.years_left)
+
+    start = time.perf_counter()
+    swaps = evaluate(pool, roster, candidates, args.cap)
+    elapsed = time.perf_counter() - start
+
+    n_scanned = len(roster) * len(candidates) * (1 + (len(roster) - 1) / 2)
+    print(f"{len(candidates)} candidates, {n_scanned:,.0f} swaps scanned in {elapsed:.3f} s, "
+          f"{len(swaps)} improve the roster")
+    if swaps.empty:
+        print("No swap improves the roster under the cap")
+        return
+    if (swaps['kind'] == '2-for-1+fill').any():
+        print("2-for-1+fill: out_1 and out_2 leave, in arrives, and fill is signed for the open spot")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(describe(swaps, pool).head(args.top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
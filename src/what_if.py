@@ -0,0 +1,120 @@
+"""
+Interactive roster what-ifs: lock or exclude players, cap players per team, list the K best rosters
+
+Usage examples:
+    python what_if.py --lock "Connor McDavid" --top 5
+    python what_if.py --exclude-years-left-over 5 --max-per-team 3 --cap 88e6
+    python what_if.py --interactive
+
+In interactive mode one model stays loaded and each command only adds or removes the constraints it
+touches (lock NAME, exclude NAME, release NAME, team-limit N, cap AMOUNT, top K, solve, quit).
+
+Author: Kevin Kang
+"""
+
+import argparse
+import shlex
+
+import numpy as np
+import pandas as pd
+
+import paths
+from optimizer import InfeasibleRosterError, RosterModel, pool_arrays, salary_cap
+
+
+def player_indices(merged_df, names):
+    indices = []
+    for name in names:
+        matches = np.flatnonzero(merged_df['player'].to_numpy() == name)
+        if not len(matches):
+            raise ValueError(f"Unknown player: {name}")
+        indices.extend(matches.tolist())
+    return np.array(indices, dtype=np.int64)
+
+
+def set_team_limit(model, merged_df, max_per_team):
+    for name in [name for name in model.problem.constraints if name.startswith('Team_Limit_')]:
+        model.remove_constraint(name)
+    if max_per_team is None:
+        return
+    for index, team in enumerate(merged_df['team_name'].dropna().unique()):
+        model.add_limit(f"Team_Limit_{index}", (merged_df['team_name'] == team).to_numpy(), max_per_team)
+
+
+def show(merged_df, rosters, value, cost):
+    for rank, roster in enumerate(rosters, start=1):
+        roster_df = merged_df.iloc[roster][['player', 'Position', 'team_name', 'cps']].reset_index(drop=True)
+        roster_df['cap_hit'] = cost[roster]
+        print(f"\nRoster {rank}: total CPS {value[roster].sum():.4f}, cap hit {cost[roster].sum():,.0f}")
+        print(roster_df)
+
+
+def run_command(model, merged_df, words):
+    command, args = words[0], words[1:]
+    if command in ('lock', 'exclude', 'release'):
+        getattr(model, command)(player_indices(merged_df, [' '.join(args)]))
+    elif command == 'team-limit':
+        set_team_limit(model, merged_df, int(args[0]) if args else None)
+    elif command == 'cap':
+        model.set_cap(float(args[0]))
+    elif command == 'top':
+        return model.top_k(int(args[0]))
+    elif command == 'solve':
+        return [model.solve()]
+    else:
+        raise ValueError(f"Unknown command: {command}")
+    return None
+
+
+def interactive(model, merged_df, value, cost):
+    while True:
+        try:
+            line = input('what-if> ').strip()
+        except EOFError:
+            break
+        if not line:
+            continue
+        if line in ('quit', 'exit'):
+            break
+        try:
+            rosters = run_command(model, merged_df, shlex.split(line))
+            if rosters is not None:
+                show(merged_df, rosters, value, cost)
+        except (ValueError, IndexError, InfeasibleRosterError) as e:
+            print(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--data', default=paths.merged_path)
+    parser.add_argument('--cap', type=float, default=salary_cap)
+    parser.add_argument('--lock', action='append', default=[], metavar='PLAYER')
+    parser.add_argument('--exclude', action='append', default=[], metavar='PLAYER')
+    parser.add_argument('--exclude-years-left-over', type=int, metavar='YEARS')
+    parser.add_argument('--max-per-team', type=int)
+    parser.add_argument('--top', type=int, default=1)
+    parser.add_argument('--min-difference', type=int, default=1, help='players that must differ between rosters')
+    parser.add_argument('--interactive', action='store_true')
+    args = parser.parse_args()
+
+    merged_df = pd.read_csv(args.data, float_precision='round_trip')
+    value, cost, masks = pool_arrays(merged_df)
+    model = RosterModel(value, cost, masks, args.cap)
+
+    model.lock(player_indices(merged_df, args.lock))
+    model.exclude(player_indices(merged_df, args.exclude))
+    if args.exclude_years_left_over is not None:
+        model.exclude(np.flatnonzero(merged_df['contract_years_left'].to_numpy() > args.exclude_years_left_over))
+    set_team_limit(model, merged_df, args.max_per_team)
+
+    if args.interactive:
+        interactive(model, merged_df, value, cost)
+        return
+    try:
+        show(merged_df, model.top_k(args.top, args.min_difference), value, cost)
+    except InfeasibleRosterError as e:
+        print(e)
+
+
+if __name__ == '__main__':
+    main()